@@ -0,0 +1,150 @@
+# api_server.py
+"""
+Headless JSON API for partner apps and kiosks, independent of the Streamlit script.
+Runs on Tornado (already installed with Streamlit): one async process with the catalogue preloaded,
+HTTP/1.1 keep-alive, and a batch endpoint that answers many calls in one round trip. Matching and chat
+are CPU-bound, so calls run on the loop's thread pool; the event loop keeps accepting connections and
+answering /health while they run, but they share one interpreter, so run several processes to scale.
+
+    python api_server.py --port 8600
+
+POST /v1/match    {"profile": {...}, "top_k": 20, "offset": 0}   (scores: % of the best match's relevance)
+POST /v1/chat     {"message": "...", "profile": {...}, "lang": "en"}
+POST /v1/explain  {"scheme_id": "...", "profile": {...}, "lang": "en"}
+POST /v1/batch    {"requests": [{"endpoint": "match", "body": {...}}, ...]}
+GET  /health
+"""
+import argparse
+import asyncio
+import json
+
+import tornado.web
+from localization import LANGUAGES
+import data_manager
+import chatbot
+
+DEFAULT_TOP_K = 20
+MAX_TOP_K = 100
+MAX_BATCH = 100
+
+class BadRequest(ValueError):
+    pass
+
+def _profile(body):
+    profile = body.get('profile', {})
+    if not isinstance(profile, dict):
+        raise BadRequest("'profile' must be an object")
+    return profile
+
+def _lang(body):
+    lang = body.get('lang', 'en')
+    if not isinstance(lang, str) or lang not in LANGUAGES:
+        raise BadRequest(f"unsupported lang {lang!r}")
+    return lang
+
+def _string(body, field):
+    value = body.get(field)
+    if not isinstance(value, str) or not value:
+        raise BadRequest(f"'{field}' must be a non-empty string")
+    return value
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def match(body):
+    top_k, offset = body.get('top_k', DEFAULT_TOP_K), body.get('offset', 0)
+    if not _is_int(top_k) or not 0 < top_k <= MAX_TOP_K or not _is_int(offset) or offset < 0:
+        raise BadRequest(f"'top_k' must be 1-{MAX_TOP_K} and 'offset' a non-negative integer")
+    return {'catalogue_version': data_manager.get_catalogue().version,
+            'matches': data_manager.find_matching_schemes(_profile(body), top_k=top_k, offset=offset)}
+
+def chat(body):
+    # The API is stateless: the updated profile goes back to the client for its next call
+    profile = dict(_profile(body))
+    response = chatbot.get_bot_response(_string(body, 'message'), profile, _lang(body))
+    return {**response, 'profile': profile}
+
+def explain(body):
+    return {'text': chatbot.get_eligibility_explanation(_string(body, 'scheme_id'), _profile(body), _lang(body))}
+
+ENDPOINTS = {'match': match, 'chat': chat, 'explain': explain}
+
+def call(endpoint, body):
+    """Runs one endpoint and returns (status, payload)."""
+    if not isinstance(endpoint, str):
+        return 400, {'error': "'endpoint' must be a string"}
+    if endpoint not in ENDPOINTS:
+        return 404, {'error': f"unknown endpoint {endpoint!r}"}
+    if not isinstance(body, dict):
+        return 400, {'error': "request body must be a JSON object"}
+    try:
+        return 200, ENDPOINTS[endpoint](body)
+    except BadRequest as e:
+        return 400, {'error': str(e)}
+
+class JsonHandler(tornado.web.RequestHandler):
+    def reply(self, status, payload):
+        self.set_status(status)
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+        self.finish(json.dumps(payload, ensure_ascii=False))
+
+    def body(self):
+        try:
+            return json.loads(self.request.body or b'{}')
+        except ValueError:
+            return None
+
+def call_batch(requests):
+    """Runs the calls of a batch in order and returns their {'status', 'body'} responses."""
+    responses = []
+    for request in requests:
+        status, payload = call(request.get('endpoint'), request.get('body', {})) if isinstance(request, dict) else (400, {'error': "each request must be an object"})
+        responses.append({'status': status, 'body': payload})
+    return responses
+
+async def _off_loop(func, *args):
+    # Ranking and chat are CPU-bound: run them on the default thread pool, not on the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+class EndpointHandler(JsonHandler):
+    async def post(self, endpoint):
+        body = self.body()
+        self.reply(*await _off_loop(call, endpoint, body) if body is not None else (400, {'error': "invalid JSON"}))
+
+class BatchHandler(JsonHandler):
+    async def post(self):
+        body = self.body()
+        requests = body.get('requests') if isinstance(body, dict) else None
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+            return self.reply(400, {'error': f"'requests' must be a list of at most {MAX_BATCH} calls"})
+        self.reply(200, {'responses': await _off_loop(call_batch, requests)})
+
+class HealthHandler(JsonHandler):
+    def get(self):
+        self.reply(200, {'status': 'ok', 'catalogue_version': data_manager.get_catalogue().version})
+
+def make_app():
+    return tornado.web.Application([
+        (r"/v1/batch", BatchHandler),
+        (r"/v1/(match|chat|explain)", EndpointHandler),
+        (r"/health", HealthHandler),
+    ])
+
+async def serve(port, address=''):
+    # Preload the catalogue with its ranking index and scheme store, so the first request does not pay
+    # for them; later versions are built by the watcher's background checks
+    data_manager.get_scheme(next(iter(data_manager.load_schemes()), ''))
+    app = make_app()
+    app.listen(port, address, idle_connection_timeout=60, xheaders=True)
+    print(f"Serving the recommendation API on http://{address or '0.0.0.0'}:{port}", flush=True)
+    await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless JSON API for scheme recommendations and chat.")
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--address', default='')
+    args = parser.parse_args()
+    asyncio.run(serve(args.port, args.address))
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,44 @@ from localization import LANGUAGES
 import data_manager
 import chatbot
 import ui_components
+import turn_pipeline
+import instrumentation
+from chat_history import ChatHistory
+
+MAX_RECOMMENDATIONS = 100  # Best matches kept in the session; the dashboard pages through them
+SCHEMES_PER_PAGE = 10
 
 # --- Page Configuration and State Initialization ---
 if 'lang' not in st.session_state: st.session_state.lang = 'en'
 text = LANGUAGES[st.session_state.lang]
 st.set_page_config(page_title=text['page_title'], page_icon="✨", layout="wide", initial_sidebar_state="expanded")
 
+@instrumentation.timed("initialize_session_state")
 def initialize_session_state():
     if 'active_tab' not in st.session_state: st.session_state.active_tab = text['dashboard_tab']
-    defaults = {'chat_history': [], 'user_profile': {}, 'recommended_schemes': [], 'audio_to_play': None, 'light_mode': False, 'explain_scheme_id': None}
+    defaults = {'chat_history': ChatHistory(), 'chat_window': ui_components.CHAT_PAGE_SIZE, 'user_profile': {}, 'recommended_schemes': [], 'recommended_version': None, 'audio_to_play': None, 'light_mode': False, 'explain_scheme_id': None, 'dashboard_page': 0, 'pending_turn': None, 'turn_latencies': []}
     for key, value in defaults.items():
         if key not in st.session_state: st.session_state[key] = value
 
+def find_recommendations(user_profile):
+    return data_manager.find_matching_schemes(user_profile, top_k=MAX_RECOMMENDATIONS)
+
+def set_recommendations(schemes):
+    # The catalogue version is kept with the ids so a hot reload can be noticed on the dashboard
+    st.session_state.recommended_schemes = schemes; st.session_state.dashboard_page = 0
+    st.session_state.recommended_version = data_manager.get_catalogue().version
+
+def show_updated_schemes(schemes, text):
+    set_recommendations(schemes)
+    st.session_state.active_tab = text['dashboard_tab']
+    st.toast(text['toast_schemes_updated'], icon="✅")
+
+@st.fragment(run_every=1.0)
+def watch_pending_turn():
+    """Reruns the app once a scheme search that outlived its timeout has finished."""
+    if st.session_state.pending_turn is None or st.session_state.pending_turn.done('schemes'):
+        st.rerun(scope="app")
+
 # --- Main Application ---
 def main():
     initialize_session_state()
@@ -25,26 +51,34 @@ def main():
 
     # --- Sidebar and Theme Logic (Unchanged) ---
     with st.sidebar:
-        selected_lang_display = "English" if lang == "en" else "हिंदी"
-        lang_options = ["English", "हिंदी"]
-        new_lang_display = st.selectbox(label=text['lang_select'], options=lang_options, index=lang_options.index(selected_lang_display))
-        new_lang = 'en' if new_lang_display == "English" else 'hi'
+        lang_options = list(LANGUAGES)
+        new_lang = st.selectbox(label=text['lang_select'], options=lang_options, index=lang_options.index(lang), format_func=LANGUAGES.display_name)
         if new_lang != lang:
             st.session_state.lang = new_lang; st.rerun()
         st.toggle(text['theme_toggle'], key='light_mode')
 
     current_theme = "light" if st.session_state.light_mode else "dark"
     ui_components.apply_custom_css(current_theme)
+    if instrumentation.ENABLED: ui_components.display_profiler_panel()
 
     # --- Profile and Scheme Finding Logic (Unchanged) ---
     if ui_components.display_profile_sidebar(lang):
-        schemes = data_manager.find_matching_schemes(st.session_state.user_profile)
-        st.session_state.recommended_schemes = schemes
+        set_recommendations(find_recommendations(st.session_state.user_profile))
         st.toast(text['toast_schemes_found'], icon="🎉")
         st.session_state.active_tab = text['dashboard_tab']; st.rerun()
     
     st.title(text['main_title']); st.caption(text['caption'])
 
+    # --- Late results of a previous chat turn ---
+    pending_turn = st.session_state.pending_turn
+    if pending_turn is not None:
+        if pending_turn.done('schemes'):
+            st.session_state.pending_turn = None
+            schemes = pending_turn.result('schemes', 0)
+            if schemes is not None: show_updated_schemes(schemes, text)
+        else:
+            watch_pending_turn()
+
     # --- "Why am I eligible?" Logic (Unchanged) ---
     if st.session_state.explain_scheme_id:
         explanation = chatbot.get_eligibility_explanation(st.session_state.explain_scheme_id, st.session_state.user_profile, lang)
@@ -65,35 +99,55 @@ def main():
     if st.session_state.active_tab == text['dashboard_tab']:
         # Dashboard content...
         st.header(text['dashboard_header']); st.write(text['dashboard_subheader']); st.divider()
+        catalogue = data_manager.get_catalogue()
+        if st.session_state.recommended_schemes and st.session_state.recommended_version != catalogue.version:
+            # The catalogue was reloaded since the search: redo it, so removed or edited schemes are not shown
+            st.session_state.recommended_schemes = find_recommendations(st.session_state.user_profile)
+            st.session_state.recommended_version = catalogue.version
         if st.session_state.recommended_schemes:
-            cols = st.columns(2 if len(st.session_state.recommended_schemes) > 1 else 1)
-            for i, scheme in enumerate(st.session_state.recommended_schemes):
-                with cols[i % 2]: ui_components.display_scheme_card(scheme, lang)
+            schemes = st.session_state.recommended_schemes
+            page_count = (len(schemes) + SCHEMES_PER_PAGE - 1) // SCHEMES_PER_PAGE
+            page = min(st.session_state.dashboard_page, page_count - 1)
+            page_schemes = schemes[page * SCHEMES_PER_PAGE:(page + 1) * SCHEMES_PER_PAGE]
+            # A scheme removed by a reload that lands mid-render has no data; its card is skipped
+            cards = [(scheme, data) for scheme in page_schemes if (data := data_manager.get_scheme(scheme['id'], catalogue)) is not None]
+            with instrumentation.span("dashboard_cards"):
+                cols = st.columns(2 if len(cards) > 1 else 1)
+                for i, (scheme, data) in enumerate(cards):
+                    with cols[i % 2]: ui_components.display_scheme_card(scheme, data, lang)
+            new_page = ui_components.display_pager(page, page_count, text)
+            if new_page != page:
+                st.session_state.dashboard_page = new_page; st.rerun()
         else:
             st.info(text['dashboard_info'])
     
     elif st.session_state.active_tab == text['chat_tab']:
         # Chat content...
-        st.header(text['chat_header']); ui_components.display_chat_history()
+        st.header(text['chat_header']); ui_components.display_chat_history(text)
         
         ### THIS BLOCK CONTAINS THE REDIRECT FIX ###
-        if st.session_state.chat_history and st.session_state.chat_history[-1]['type'] == 'user':
+        last_message = st.session_state.chat_history.last()
+        if last_message and last_message['type'] == 'user':
             with st.chat_message("assistant", avatar="assistant"):
+                user_message = last_message['message']
+                turn = turn_pipeline.start_turn(user_message, st.session_state.user_profile, lang, ui_components.text_to_audio, find_recommendations)
+                # The reply is shown as soon as it exists; audio and schemes are prepared concurrently
+                st.write(turn.response['text'])
+                st.session_state.chat_history.append({'type': 'assistant', 'message': turn.response['text']})
+
                 with st.spinner("Bot is thinking..."):
-                    user_message = st.session_state.chat_history[-1]['message']
-                    response = chatbot.get_bot_response(user_message, st.session_state.user_profile, lang)
-                    st.session_state.chat_history.append({'type': 'assistant', 'message': response['text']})
-                    
-                    audio_bytes = ui_components.text_to_audio(response['text'], lang)
-                    if audio_bytes: st.session_state.audio_to_play = audio_bytes
-                    
+                    audio_bytes = turn.result('tts', turn_pipeline.TTS_TIMEOUT)
+                    # Only the cache key is kept in the session; the bytes stay in the shared audio cache
+                    if audio_bytes: st.session_state.audio_to_play = (turn.response['text'], lang)
+
                     # THE FIX: Check for the action and set the tab for the next rerun
-                    if response.get("action") == "calculate_schemes":
-                        st.session_state.recommended_schemes = data_manager.find_matching_schemes(st.session_state.user_profile)
-                        st.session_state.active_tab = text['dashboard_tab']
-                        st.toast(text['toast_schemes_updated'], icon="✅")
+                    if turn.has('schemes'):
+                        schemes = turn.result('schemes', turn_pipeline.SCHEMES_TIMEOUT)
+                        if schemes is not None: show_updated_schemes(schemes, text)
+                        elif not turn.done('schemes'): st.session_state.pending_turn = turn
 
-                    st.rerun()
+                st.session_state.turn_latencies = (st.session_state.turn_latencies + [turn.latencies])[-50:]
+                st.rerun()
 
         # User input section (unchanged)
         text_input = st.chat_input(text['chat_input_prompt'])
@@ -102,12 +156,16 @@ def main():
         user_input = text_input or voice_input
         if user_input:
             st.session_state.chat_history.append({'type': 'user', 'message': user_input})
+            st.session_state.chat_window = ui_components.CHAT_PAGE_SIZE
             st.rerun()
 
     # Audio player (unchanged)
     if st.session_state.get('audio_to_play'):
-        st.audio(st.session_state.audio_to_play, autoplay=True)
+        # Played only if the turn's synthesis is still cached; a miss is skipped, never re-synthesized here
+        audio_bytes = ui_components.cached_audio(*st.session_state.audio_to_play)
+        if audio_bytes: st.audio(audio_bytes, autoplay=True)
         st.session_state.audio_to_play = None
 
 if __name__ == "__main__":
-    main()
+    with instrumentation.rerun():
+        main()
@@ -0,0 +1,150 @@
+# audio_cache.py
+"""
+Content-addressed cache for synthesized speech, keyed by (text, lang).
+Most assistant replies are fixed templates, so after the first synthesis they are served from an
+in-memory LRU shared by all sessions, backed by a size-bounded directory on disk.
+
+Warm-up: python audio_cache.py warm   (pre-renders every static chatbot reply in every language)
+"""
+import argparse
+import hashlib
+import io
+import os
+import threading
+
+from gtts import gTTS
+from caching import LRUCache
+
+DEFAULT_DIRECTORY = os.environ.get('AUDIO_CACHE_DIR', '.audio_cache')
+DEFAULT_MAX_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+def synthesize_gtts(text, lang):
+    """Renders text to MP3 bytes with gTTS (needs network access)."""
+    tts_lang = 'en-IN' if lang == 'en' else lang
+    audio_bytes = io.BytesIO()
+    gTTS(text=text, lang=tts_lang, slow=False).write_to_fp(audio_bytes)
+    return audio_bytes.getvalue()
+
+def audio_key(text, lang):
+    return hashlib.sha256(f"{lang}\0{text}".encode('utf-8')).hexdigest()
+
+class AudioCache:
+    """
+    Two-tier (memory, disk) cache in front of a synthesizer: any callable (text, lang) -> bytes,
+    so tests and benchmarks can swap gTTS for a local stub.
+    """
+
+    def __init__(self, synthesize=None, directory=DEFAULT_DIRECTORY,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.synthesize = synthesize or synthesize_gtts  # Looked up now, so the module default can be swapped too
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(max_entries=4096, max_weight=max_memory_bytes, weigher=len)
+        self.disk_hits = self.syntheses = 0
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = None  # Measured on first write
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.mp3")
+
+    def peek(self, text, lang):
+        """Returns the MP3 bytes for text if either tier has them, else None; never synthesizes."""
+        key = audio_key(text, lang)
+        audio = self.memory.get(key)
+        if audio is None:
+            audio = self._read_disk(key)
+            if audio is not None:
+                self.disk_hits += 1
+                self.memory.put(key, audio)
+        return audio
+
+    def get(self, text, lang):
+        """Returns the MP3 bytes for text, synthesizing them only if neither tier has them."""
+        audio = self.peek(text, lang)
+        if audio is None:
+            audio = self.synthesize(text, lang)
+            self.syntheses += 1
+            key = audio_key(text, lang)
+            self._write_disk(key, audio)
+            self.memory.put(key, audio)
+        return audio
+
+    def warm(self, texts_by_lang):
+        """Renders every (lang, text) pair ahead of time; returns how many needed synthesis."""
+        before = self.syntheses
+        for lang, texts in texts_by_lang.items():
+            for text in texts:
+                self.get(text, lang)
+        return self.syntheses - before
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            os.utime(path)  # The modification time doubles as the disk tier's recency
+            return audio
+        except OSError:
+            return None
+
+    def _write_disk(self, key, audio):
+        path = self._path(key)
+        with self._disk_lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(audio)
+                os.replace(temp_path, path)  # Readers never see a half-written file
+                if self._disk_bytes is None:
+                    self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+                else:
+                    self._disk_bytes += len(audio)
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+            except OSError:
+                pass  # The disk tier is best effort; the memory tier still has the audio
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.mp3'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, path, stat.st_size
+
+    def _evict_disk(self):
+        """Deletes least recently used files until the disk tier is back under 90% of its bound."""
+        target = self.max_disk_bytes * 0.9
+        entries = sorted(self._disk_entries())
+        self._disk_bytes = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self._disk_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self._disk_bytes -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        return {**self.memory.stats(), 'disk_hits': self.disk_hits, 'syntheses': self.syntheses}
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the text-to-speech audio cache.")
+    parser.add_argument('command', choices=['warm'])
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    import chatbot
+    from localization import LANGUAGES
+    cache = AudioCache(directory=args.directory)
+    rendered = cache.warm({lang: chatbot.static_responses(lang) for lang in LANGUAGES})
+    print(f"Synthesized {rendered} replies into {args.directory}; {cache.disk_hits} were already cached")
+
+if __name__ == "__main__":
+    main()
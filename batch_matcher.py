@@ -0,0 +1,204 @@
+# batch_matcher.py
+"""
+Offline eligibility runs over whole beneficiary lists (e.g. a CSV from a district camp).
+Scores are the tag-count scores of data_manager.match_schemes, computed for a chunk of profiles at a time
+with NumPy instead of one set intersection per (profile, scheme) pair.
+
+Usage: python batch_matcher.py profiles.csv matches.parquet [--chunk-size 50000] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CHUNK_SIZE = 50_000
+MAX_CELLS_PER_BLOCK = 16_000_000  # profiles x schemes scored at once; bounds the uint8 work matrices
+# Fixed, so a chunk without eligible pairs (all-null columns) cannot set the schema of the whole file
+MATCH_SCHEMA = pa.schema([('profile_id', pa.string()), ('scheme_id', pa.string()), ('score', pa.uint8())])
+
+class BatchMatcher:
+    """Bit-packed tag x scheme incidence matrix for one catalogue, built once and reused for every chunk."""
+
+    def __init__(self, all_schemes):
+        self.scheme_ids = np.array(list(all_schemes), dtype=object)
+        self.vocabulary = {}
+        tag_rows, scheme_cols = [], []
+        for col, scheme_data in enumerate(all_schemes.values()):
+            for tag in set(tag.lower() for tag in scheme_data.get("tags", [])):
+                tag_rows.append(self.vocabulary.setdefault(tag, len(self.vocabulary)))
+                scheme_cols.append(col)
+        # One extra all-zero row: unknown words and padding point at it and add nothing to the counts
+        self.unknown = len(self.vocabulary)
+        incidence = np.zeros((self.unknown + 1, len(self.scheme_ids)), dtype=np.uint8)
+        incidence[tag_rows, scheme_cols] = 1
+        self.packed = np.packbits(incidence, axis=1)
+
+    def encode_profiles(self, profiles):
+        """
+        Turns the string columns of a profile frame into an (n_profiles, k) matrix of distinct tag ids,
+        padded with the unknown id. Each distinct cell value is tokenized only once.
+        """
+        columns = []
+        for name in profiles.columns:
+            if not pd.api.types.is_string_dtype(profiles[name]):
+                continue  # Only string fields carry keywords, as in profile_keywords
+            codes, uniques = pd.factorize(profiles[name])
+            tokens = [[self.vocabulary.get(word, self.unknown) for word in value.lower().split()] if isinstance(value, str) else []
+                      for value in uniques]
+            width = max(map(len, tokens), default=0)
+            if not width:
+                continue
+            table = np.full((len(uniques) + 1, width), self.unknown, dtype=np.int32)  # Last row: missing values
+            for row, ids in enumerate(tokens):
+                table[row, :len(ids)] = ids
+            columns.append(table[codes])  # code -1 (NaN) picks the last row
+        if not columns:
+            return np.full((len(profiles), 1), self.unknown, dtype=np.int32)
+        keywords = np.concatenate(columns, axis=1)
+        # A keyword set counts each word once: blank out repeats after sorting each row
+        keywords.sort(axis=1)
+        repeats = np.zeros(keywords.shape, dtype=bool)
+        repeats[:, 1:] = keywords[:, 1:] == keywords[:, :-1]
+        keywords[repeats] = self.unknown
+        return keywords
+
+    def score(self, keywords):
+        """Returns the (n_profiles, n_schemes) uint8 matrix of min(len(common_tags) * 35, 100)."""
+        counts = np.zeros((len(keywords), len(self.scheme_ids)), dtype=np.uint8)
+        for slot in keywords.T:
+            counts += np.unpackbits(self.packed[slot], axis=1, count=len(self.scheme_ids))
+        return np.minimum(counts.astype(np.uint16) * 35, 100).astype(np.uint8)
+
+    def match(self, profiles, profile_ids):
+        """
+        Scores one frame of profiles and returns a long frame of (profile_id, scheme_id, score) for every
+        eligible pair, each profile's schemes ordered like match_schemes orders them.
+        """
+        block = max(1, MAX_CELLS_PER_BLOCK // max(1, len(self.scheme_ids)))
+        keywords = self.encode_profiles(profiles)
+        frames = []
+        for start in range(0, len(profiles), block):
+            scores = self.score(keywords[start:start + block])
+            rows, cols = np.nonzero(scores)
+            values = scores[rows, cols]
+            order = np.lexsort((cols, -values.astype(np.int16), rows))
+            rows, cols, values = rows[order], cols[order], values[order]
+            frames.append(pd.DataFrame({
+                'profile_id': np.asarray(profile_ids)[start + rows],
+                'scheme_id': self.scheme_ids[cols],
+                'score': values,
+            }))
+        if not frames:
+            return pd.DataFrame({'profile_id': [], 'scheme_id': [], 'score': np.array([], dtype=np.uint8)})
+        return pd.concat(frames, ignore_index=True)
+
+def iter_profile_chunks(profiles_path, chunk_size=DEFAULT_CHUNK_SIZE, id_column='profile_id'):
+    """Yields (profiles, profile_ids) frames from a CSV; rows are numbered when there is no id column."""
+    first_row = 0
+    for chunk in pd.read_csv(profiles_path, chunksize=chunk_size, dtype={id_column: str}):
+        if id_column in chunk.columns:
+            profile_ids = chunk.pop(id_column).to_numpy()
+        else:
+            profile_ids = np.arange(first_row, first_row + len(chunk))
+        first_row += len(chunk)
+        yield chunk, profile_ids
+
+class MatchWriter:
+    """Appends result frames to a Parquet or CSV file (picked by extension) without holding them in memory."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.parquet = str(output_path).endswith('.parquet')
+        self.writer = None
+        self.rows = 0
+
+    def write(self, matches):
+        if self.parquet:
+            table = pa.Table.from_pandas(matches.astype({'profile_id': str}), schema=MATCH_SCHEMA, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.output_path, MATCH_SCHEMA)
+            self.writer.write_table(table)
+        else:
+            matches.to_csv(self.output_path, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        self.rows += len(matches)
+
+    def close(self):
+        if self.parquet and self.writer is None:
+            self.writer = pq.ParquetWriter(self.output_path, MATCH_SCHEMA)  # No chunks: still a valid, empty file
+        if self.writer is not None:
+            self.writer.close()
+
+# The matcher of a pool worker process, built once by _init_worker, so the catalogue is sent to each
+# worker once instead of being pickled with every task
+_worker_matcher = None
+
+def _init_worker(all_schemes):
+    global _worker_matcher
+    _worker_matcher = BatchMatcher(all_schemes)
+
+def _match_chunk(profiles, profile_ids):
+    return _worker_matcher.match(profiles, profile_ids)
+
+def _pool_context():
+    # Never fork the caller: it may be the multi-threaded Streamlit or API server, whose locks and event
+    # loop a forked child would inherit mid-use. forkserver children fork from a clean, single-threaded server.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def iter_parallel_matches(all_schemes, chunks, workers, max_pending=None):
+    """
+    Scores (profiles, profile_ids) chunks on a process pool and yields the result frames in input order.
+    At most max_pending chunks (default: two per worker) are in flight, so a slow consumer holds back the reader.
+    """
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                             initializer=_init_worker, initargs=(all_schemes,)) as pool:
+        pending = deque()
+        for profiles, profile_ids in chunks:
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_match_chunk, profiles, profile_ids))
+        while pending:
+            yield pending.popleft().result()
+
+def iter_matches(all_schemes, chunks, workers=1):
+    """Yields the match frame of every chunk, in order; the output does not depend on the worker count."""
+    if workers > 1:
+        yield from iter_parallel_matches(all_schemes, chunks, workers)
+    else:
+        matcher = BatchMatcher(all_schemes)
+        for profiles, profile_ids in chunks:
+            yield matcher.match(profiles, profile_ids)
+
+def run_batch(all_schemes, profiles_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """Matches every profile in profiles_path against the catalogue and writes the eligible pairs. Returns the row count."""
+    writer = MatchWriter(output_path)
+    try:
+        for matches in iter_matches(all_schemes, iter_profile_chunks(profiles_path, chunk_size), workers):
+            writer.write(matches)
+    finally:
+        writer.close()
+    return writer.rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scheme eligibility for a CSV of citizen profiles.")
+    parser.add_argument('profiles', help="CSV with one profile per row (optional profile_id column)")
+    parser.add_argument('output', help="Output file, .parquet or .csv")
+    parser.add_argument('--schemes', default='schemes.json')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (1 runs in-process)")
+    args = parser.parse_args()
+
+    with open(args.schemes, 'r', encoding='utf-8') as f:
+        all_schemes = json.load(f)
+    rows = run_batch(all_schemes, args.profiles, args.output, args.chunk_size, args.workers)
+    print(f"Wrote {rows} eligible (profile, scheme) pairs to {args.output}")
+
+if __name__ == "__main__":
+    main()
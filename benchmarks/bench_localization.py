@@ -0,0 +1,103 @@
+# benchmarks/bench_localization.py
+"""
+Startup time and memory of the lazily loaded language packs (localization.LanguagePacks) against the
+single module-level dict every language used to live in, for 12 languages: the two real packs plus ten
+synthetic ones of the same size. Also measures `import chatbot`, which compiles every language's intent
+keywords, and counts the packs each case has parsed by the end. Every measurement runs in a fresh interpreter.
+Run from the repository root: python -m benchmarks.bench_localization
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from localization import LANGUAGES
+
+EXTRA_LANGUAGES = {"bn": "বাংলা", "te": "తెలుగు", "mr": "मराठी", "ta": "தமிழ்", "ur": "اردو",
+                   "gu": "ગુજરાતી", "kn": "ಕನ್ನಡ", "ml": "മലയാളം", "or": "ଓଡ଼ିଆ", "pa": "ਪੰਜਾਬੀ"}
+
+# Runs in the child: imports the packs, reads one language the way a new session does, reports the cost.
+# preload runs before the clock starts (e.g. Streamlit, which chatbot imports but is not under test).
+MEASURE = """
+import json, os, sys, time, tracemalloc
+sys.path.insert(0, {path!r})
+{preload}
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+tracemalloc.start()
+rss_before, started = rss(), time.perf_counter()
+{setup}
+text = LANGUAGES['en']; text['page_title']
+{touch_all}
+elapsed = time.perf_counter() - started
+parsed = len(LANGUAGES.loaded()) if hasattr(LANGUAGES, 'loaded') else len(LANGUAGES)
+print(json.dumps([elapsed, tracemalloc.get_traced_memory()[0], rss() - rss_before, parsed]))
+"""
+
+def synthetic_pack(pack, code):
+    """A copy of pack whose strings are marked with the language code."""
+    if isinstance(pack, dict):
+        return {key: synthetic_pack(value, code) for key, value in pack.items()}
+    if isinstance(pack, list):
+        return [synthetic_pack(value, code) for value in pack]
+    return f"{pack} [{code}]" if isinstance(pack, str) else pack
+
+def write_fixtures(directory):
+    """
+    Writes the 12 packs both ways: locales/ files (with their keyword files) and one legacy_localization.py
+    dict, where the keywords lived inside each pack.
+    """
+    packs = {code: json.loads(json.dumps(LANGUAGES[code])) for code in LANGUAGES}
+    keywords = LANGUAGES.intent_keywords()
+    names = dict(LANGUAGES.names)
+    for code, name in EXTRA_LANGUAGES.items():
+        packs[code], keywords[code], names[code] = synthetic_pack(packs['en'], code), synthetic_pack(keywords['en'], code), name
+    locales = os.path.join(directory, 'locales')
+    os.makedirs(locales)
+    for code, pack in packs.items():
+        with open(os.path.join(locales, f'{code}.json'), 'w', encoding='utf-8') as f:
+            json.dump(pack, f, ensure_ascii=False, indent=4)
+        with open(os.path.join(locales, f'{code}.keywords.json'), 'w', encoding='utf-8') as f:
+            json.dump(keywords[code], f, ensure_ascii=False, indent=4)
+        packs[code]['intent_keywords'] = keywords[code]
+    with open(os.path.join(locales, 'languages.json'), 'w', encoding='utf-8') as f:
+        json.dump(names, f, ensure_ascii=False)
+    with open(os.path.join(directory, 'legacy_localization.py'), 'w', encoding='utf-8') as f:
+        f.write(f"LANGUAGES = {packs!r}\n")
+    return locales
+
+def measure(directory, setup, touch_all, runs, preload=""):
+    script = MEASURE.format(path=directory, setup=setup, touch_all=touch_all, preload=preload)
+    samples = [json.loads(subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout)
+               for _ in range(runs)]
+    return [statistics.median(column) for column in zip(*samples)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        locales = write_fixtures(directory)
+        lazy = f"sys.path.insert(0, {os.getcwd()!r})\nfrom localization import LanguagePacks\nLANGUAGES = LanguagePacks({locales!r})"
+        # The app's real import path, with localization pointed at the 12 fixture languages
+        chatbot_preload = f"os.environ['LOCALES_DIR'] = {locales!r}\nsys.path.insert(0, {os.getcwd()!r})\nimport data_manager"
+        cases = [
+            ("single dict", "from legacy_localization import LANGUAGES", "", ""),
+            ("lazy, 1 language used", lazy, "", ""),
+            ("lazy, all 12 used", lazy, "for code in LANGUAGES: LANGUAGES[code]['page_title']", ""),
+            ("import chatbot, 1 used", "import chatbot\nfrom localization import LANGUAGES", "", chatbot_preload),
+        ]
+        measure(directory, cases[0][1], "", 1)  # Lets the legacy module write its .pyc, as a deployed app would have
+        print(f"{len(EXTRA_LANGUAGES) + len(LANGUAGES)} languages, median of {args.runs} fresh interpreters")
+        print(f"{'':<24} {'startup ms':>11} {'traced KiB':>11} {'RSS KiB':>9} {'packs parsed':>13}")
+        for label, setup, touch_all, preload in cases:
+            elapsed, traced, rss, parsed = measure(directory, setup, touch_all, args.runs, preload)
+            print(f"{label:<24} {elapsed * 1000:>11.2f} {traced / 1024:>11.0f} {rss / 1024:>9.0f} {parsed:>13.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_parallel.py
+"""
+Scaling curve of batch_matcher across 1..N worker processes. Checks that every parallel run writes
+exactly the rows of the serial run, in the same order.
+Run from the repository root: python -m benchmarks.bench_parallel
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from batch_matcher import run_batch
+from benchmarks.synthetic import make_catalogue, make_profiles
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profiles', type=int, default=1_000_000)
+    parser.add_argument('--schemes', type=int, default=1_000)
+    parser.add_argument('--chunk-size', type=int, default=20_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    catalogue = make_catalogue(args.schemes)
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_path = os.path.join(tmp, 'profiles.csv')
+        pd.DataFrame(make_profiles(args.profiles)).to_csv(profiles_path, index=False)
+
+        print(f"{args.profiles:,} profiles x {args.schemes:,} schemes, chunks of {args.chunk_size:,}")
+        print(f"{'workers':>8} {'seconds':>9} {'profiles/s':>12} {'speedup':>8}")
+        serial_seconds = serial_digest = None
+        worker_counts = sorted({2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers} | {args.max_workers})
+        for workers in worker_counts:
+            output_path = os.path.join(tmp, f'matches_{workers}.csv')
+            started = time.perf_counter()
+            run_batch(catalogue, profiles_path, output_path, args.chunk_size, workers)
+            seconds = time.perf_counter() - started
+            digest = file_digest(output_path)
+            if serial_digest is None:
+                serial_seconds, serial_digest = seconds, digest
+            assert digest == serial_digest, f"{workers} workers wrote different output than the serial run"
+            print(f"{workers:>8} {seconds:>9.2f} {args.profiles / seconds:>12,.0f} {serial_seconds / seconds:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_ranking.py
+"""
+Compares the relevance ranking (ranking.py) with the old tag-count scorer (data_manager.match_schemes):
+query latency, how much of each top-k list the two agree on, and how many of the top-k positions are
+ties the scorer cannot order. Also times a catalogue reload that edits one scheme (update_ranking_index)
+against the full build.
+Run from the repository root: python -m benchmarks.bench_ranking
+"""
+import argparse
+import statistics
+import time
+
+from data_manager import build_tag_index, match_schemes, profile_keywords
+from ranking import build_ranking_index, profile_numbers, rank_schemes, update_ranking_index
+from benchmarks.synthetic import make_catalogue, make_profiles
+
+def tied_fraction(matches):
+    """Share of the records whose score equals a neighbour's, i.e. whose order is only the tie-break."""
+    scores = [m['score'] for m in matches]
+    tied = sum(1 for i, score in enumerate(scores)
+               if (i > 0 and scores[i - 1] == score) or (i + 1 < len(scores) and scores[i + 1] == score))
+    return tied / len(scores) if scores else 0.0
+
+def timed_queries(run, queries):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(run(*query))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return results, statistics.median(latencies), statistics.quantiles(latencies, n=100)[94]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--profiles', type=int, default=300)
+    parser.add_argument('--top-k', type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = make_profiles(args.profiles)
+    queries = [(profile_keywords(p), profile_numbers(p)) for p in profiles]
+    print(f"{'schemes':>9} {'build ms':>9} {'edit ms':>8} {'old p50':>8} {'old p95':>8} {'new p50':>8} {'new p95':>8} "
+          f"{'overlap':>8} {'old ties':>9} {'new ties':>9}")
+    for size in args.sizes:
+        catalogue = make_catalogue(size)
+        tag_index = build_tag_index(catalogue)
+        started = time.perf_counter()
+        ranking_index = build_ranking_index(catalogue)
+        build_ms = (time.perf_counter() - started) * 1000
+        edited_id = next(iter(catalogue))
+        edited = {**catalogue, edited_id: {**catalogue[edited_id], 'tags': catalogue[edited_id]['tags'] + ['edited']}}
+        started = time.perf_counter()
+        update_ranking_index(ranking_index, catalogue, edited, [edited_id])
+        edit_ms = (time.perf_counter() - started) * 1000
+
+        old, old_p50, old_p95 = timed_queries(lambda keywords, _: match_schemes(keywords, tag_index, top_k=args.top_k), queries)
+        new, new_p50, new_p95 = timed_queries(lambda keywords, numbers: rank_schemes(keywords, numbers, ranking_index, top_k=args.top_k), queries)
+
+        # Agreement: share of the old top-k that the new ranking also puts in its top-k
+        overlap = statistics.mean(len({m['id'] for m in a} & {m['id'] for m in b}) / len(a) for a, b in zip(old, new) if a)
+        old_ties = statistics.mean(map(tied_fraction, old))
+        new_ties = statistics.mean(map(tied_fraction, new))
+        print(f"{size:>9} {build_ms:>9.0f} {edit_ms:>8.1f} {old_p50:>8.2f} {old_p95:>8.2f} {new_p50:>8.2f} {new_p95:>8.2f} "
+              f"{overlap:>8.0%} {old_ties:>9.0%} {new_ties:>9.0%}")
+    print("Latencies in ms per query; overlap = share of the old top-k kept in the new top-k.")
+
+if __name__ == "__main__":
+    main()
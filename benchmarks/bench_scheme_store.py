@@ -0,0 +1,80 @@
+# benchmarks/bench_scheme_store.py
+"""
+Load time and memory per process of the memory-mapped scheme store against parsing schemes.json.
+Each variant runs in a fresh process that loads the catalogue and serves random lookups by id.
+"Private" memory is what the process does not share with other processes (Linux only); mapped store
+pages stay shared through the page cache, so it is the figure that multiplies with server processes.
+Run from the repository root: python -m benchmarks.bench_scheme_store
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+
+from scheme_store import SchemeStore, build_store
+from benchmarks.synthetic import make_catalogue
+
+def memory_kib():
+    """(resident, private) KiB of the current process; private is None off Linux."""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        kib = lambda name: int(fields[name].split()[0])
+        return kib('Rss'), kib('Private_Clean') + kib('Private_Dirty')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, None
+
+def load_and_lookup(mode, path, scheme_ids, results):
+    rss_before, private_before = memory_kib()
+    started = time.perf_counter()
+    if mode == 'json':
+        with open(path, 'r', encoding='utf-8') as f:
+            catalogue = json.load(f)
+    else:
+        catalogue = SchemeStore(path)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for scheme_id in scheme_ids:
+        scheme = catalogue[scheme_id]
+        scheme['name']['en'], scheme['tags']
+    lookup_us = (time.perf_counter() - started) * 1e6 / len(scheme_ids)
+    rss_after, private_after = memory_kib()
+    results.put((mode, load_seconds, lookup_us, rss_after - rss_before,
+                 None if private_after is None else private_after - private_before))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--schemes', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=10_000)
+    args = parser.parse_args()
+
+    catalogue = make_catalogue(args.schemes)
+    scheme_ids = random.Random(0).sample(list(catalogue), min(args.lookups, len(catalogue)))
+    context = multiprocessing.get_context('spawn')  # A clean interpreter per measurement
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, store_path = os.path.join(tmp, 'schemes.json'), os.path.join(tmp, 'schemes.bin')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(catalogue, f, ensure_ascii=False)
+        started = time.perf_counter()
+        build_store(catalogue, store_path)
+        print(f"{args.schemes:,} schemes: JSON {os.path.getsize(json_path) / 2**20:.1f} MiB, "
+              f"store {os.path.getsize(store_path) / 2**20:.1f} MiB (converted in {time.perf_counter() - started:.1f}s)")
+        del catalogue
+
+        print(f"{'variant':>8} {'load ms':>9} {'lookup us':>10} {'RSS MiB':>8} {'private MiB':>12}")
+        for mode, path in (('json', json_path), ('store', store_path)):
+            results = context.Queue()
+            process = context.Process(target=load_and_lookup, args=(mode, path, scheme_ids, results))
+            process.start()
+            mode, load_seconds, lookup_us, rss_kib, private_kib = results.get()
+            process.join()
+            private = f"{private_kib / 1024:>12.1f}" if private_kib is not None else f"{'n/a':>12}"
+            print(f"{mode:>8} {load_seconds * 1000:>9.1f} {lookup_us:>10.2f} {rss_kib / 1024:>8.1f} {private}")
+
+if __name__ == "__main__":
+    main()
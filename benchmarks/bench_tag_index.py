@@ -0,0 +1,55 @@
+# benchmarks/bench_tag_index.py
+"""
+Checks that the inverted tag index agrees with the old linear scan and compares their latency.
+Run from the repository root: python -m benchmarks.bench_tag_index
+"""
+import argparse
+import time
+
+from data_manager import build_tag_index, match_schemes, profile_keywords
+from benchmarks.synthetic import make_catalogue, make_profiles
+
+def linear_scan(keywords, all_schemes):
+    """The matching loop find_matching_schemes used before the index existed."""
+    eligible_schemes = []
+    for scheme_id, scheme_data in all_schemes.items():
+        scheme_tags = set(tag.lower() for tag in scheme_data.get("tags", []))
+        common_tags = keywords.intersection(scheme_tags)
+        if common_tags:
+            eligible_schemes.append({'id': scheme_id, 'score': min(len(common_tags) * 35, 100),
+                                     'reasons': [tag.capitalize() for tag in common_tags]})
+    eligible_schemes.sort(key=lambda x: x['score'], reverse=True)
+    return eligible_schemes
+
+def normalized(matches):
+    # Reasons come out of set iteration in the scan, so only their contents are comparable
+    return [(m['id'], m['score'], frozenset(m['reasons'])) for m in matches]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 30_000, 100_000])
+    parser.add_argument('--profiles', type=int, default=200)
+    args = parser.parse_args()
+
+    keyword_sets = [profile_keywords(p) for p in make_profiles(args.profiles)]
+    print(f"{'schemes':>9} {'build ms':>9} {'scan ms/q':>10} {'index ms/q':>11} {'speedup':>8}")
+    for size in args.sizes:
+        catalogue = make_catalogue(size)
+        started = time.perf_counter()
+        tag_index = build_tag_index(catalogue)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        expected = [linear_scan(keywords, catalogue) for keywords in keyword_sets]
+        scan_ms = (time.perf_counter() - started) * 1000 / len(keyword_sets)
+
+        started = time.perf_counter()
+        actual = [match_schemes(keywords, tag_index) for keywords in keyword_sets]
+        index_ms = (time.perf_counter() - started) * 1000 / len(keyword_sets)
+
+        for keywords, old, new in zip(keyword_sets, expected, actual):
+            assert normalized(old) == normalized(new), f"index disagrees with linear scan for {sorted(keywords)}"
+        print(f"{size:>9} {build_ms:>9.1f} {scan_ms:>10.2f} {index_ms:>11.2f} {scan_ms / index_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
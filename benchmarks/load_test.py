@@ -0,0 +1,127 @@
+# benchmarks/load_test.py
+"""
+Local load test for api_server.py: concurrent keep-alive connections replaying a mix of match,
+chat and explain calls, reporting requests per second and p50/p99 latency.
+Starts its own server unless --url points at a running one.
+Run from the repository root: python -m benchmarks.load_test --connections 32 --seconds 15
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import make_profiles
+from benchmarks.bench_intents import make_corpus
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def make_requests(count, batch_size, seed=0):
+    """(path, body) pairs; with batch_size > 1 they are grouped into /v1/batch calls."""
+    rng = random.Random(seed)
+    profiles, messages = make_profiles(200, seed), make_corpus(200, seed)
+    with open('schemes.json', 'r', encoding='utf-8') as f:
+        scheme_ids = list(json.load(f))
+    calls = []
+    for _ in range(count * batch_size):
+        kind = rng.choices(['match', 'chat', 'explain'], weights=[6, 3, 1])[0]
+        profile = rng.choice(profiles)
+        if kind == 'match':
+            calls.append(('match', {'profile': profile, 'top_k': 10}))
+        elif kind == 'chat':
+            calls.append(('chat', {'message': rng.choice(messages), 'profile': profile, 'lang': rng.choice(['en', 'hi'])}))
+        else:
+            calls.append(('explain', {'scheme_id': rng.choice(scheme_ids), 'profile': profile, 'lang': 'en'}))
+    if batch_size == 1:
+        return [(f"/v1/{endpoint}", body) for endpoint, body in calls]
+    return [("/v1/batch", {'requests': [{'endpoint': e, 'body': b} for e, b in calls[i:i + batch_size]]})
+            for i in range(0, len(calls), batch_size)]
+
+async def connection_worker(host, port, requests, deadline, latencies, errors):
+    """One keep-alive connection sending requests back to back until the deadline."""
+    reader, writer = await asyncio.open_connection(host, port)
+    index = 0
+    try:
+        while time.perf_counter() < deadline:
+            path, body = requests[index % len(requests)]
+            index += 1
+            payload = json.dumps(body).encode('utf-8')
+            started = time.perf_counter()
+            writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(payload)}\r\n\r\n".encode('ascii') + payload)
+            status_line = await reader.readline()
+            length = 0
+            while (line := await reader.readline()) not in (b'\r\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if b' 200 ' not in status_line:
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+async def run_load(host, port, connections, seconds, requests):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + seconds
+    await asyncio.gather(*(connection_worker(host, port, requests[i::connections] or requests, deadline, latencies, errors)
+                           for i in range(connections)))
+    return latencies, errors, time.perf_counter() - started
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"API server did not start on port {port}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help="Base URL of a running server (default: start one)")
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[1, 10])
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = subprocess.Popen([sys.executable, 'api_server.py', '--port', str(port), '--address', host],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wait_for_port(port)
+    try:
+        print(f"{args.connections} keep-alive connections, {args.seconds:g}s per run")
+        print(f"{'batch':>6} {'requests/s':>11} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for batch_size in args.batch_size:
+            requests = make_requests(2000, batch_size)
+            latencies, errors, elapsed = asyncio.run(run_load(host, port, args.connections, args.seconds, requests))
+            latencies.sort()
+            print(f"{batch_size:>6} {len(latencies) / elapsed:>11,.0f} {len(latencies) * batch_size / elapsed:>9,.0f} "
+                  f"{percentile(latencies, 0.50) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f} {len(errors):>7}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/soak_chat_history.py
+"""
+Soak test for long kiosk sessions: drives the real app headlessly (streamlit.testing AppTest) through
+thousands of chat turns and checks that rerun time and process RSS stay flat as the history grows.
+Speech synthesis is replaced by a local stub, so no network is needed.
+Run from the repository root: python -m benchmarks.soak_chat_history --turns 3000
+"""
+import argparse
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+MESSAGES = ["hello", "I am a farmer", "main kisan hoon", "college scholarship chahiye", "I need a business loan",
+            "मैं छात्र हूं", "what is this about", "show schemes", "मुझे योजनाएं दिखाओ", "thank you " * 20]
+
+def rss_mib():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Peak, not current, off Linux
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--turns', type=int, default=3000)
+    parser.add_argument('--window', type=int, default=250, help="Turns per reported window")
+    parser.add_argument('--max-time-growth', type=float, default=1.5, help="Allowed last/first window rerun time ratio")
+    parser.add_argument('--max-rss-growth', type=float, default=50, help="Allowed RSS growth in MiB after the first window")
+    args = parser.parse_args()
+
+    os.environ.setdefault('AUDIO_CACHE_DIR', tempfile.mkdtemp(prefix='soak-audio-'))
+    import audio_cache
+    audio_cache.synthesize_gtts = lambda text, lang: b'ID3' + text.encode('utf-8')  # Local stub instead of gTTS
+    from streamlit.testing.v1 import AppTest
+    from localization import LANGUAGES
+    chat_tab = LANGUAGES['en']['chat_tab']
+
+    app = AppTest.from_file(os.path.join(os.getcwd(), 'app.py'), default_timeout=60)
+    app.run()
+    app.session_state.active_tab = chat_tab
+    app.run()
+
+    print(f"{'turns':>7} {'history':>8} {'in memory':>10} {'median ms':>10} {'RSS MiB':>8}")
+    windows, durations = [], []
+    for turn in range(1, args.turns + 1):
+        started = time.perf_counter()
+        app.chat_input[0].set_value(MESSAGES[turn % len(MESSAGES)]).run()
+        durations.append(time.perf_counter() - started)
+        if app.exception:
+            sys.exit(f"app raised during turn {turn}: {app.exception}")
+        if app.session_state.active_tab != chat_tab:  # "show schemes" switches to the dashboard
+            app.session_state.active_tab = chat_tab
+            app.run()
+        if turn % args.window == 0:
+            history = app.session_state.chat_history
+            windows.append((statistics.median(durations), rss_mib()))
+            durations = []
+            print(f"{turn:>7} {len(history):>8} {len(history) - history.spilled:>10} {windows[-1][0] * 1000:>10.1f} {windows[-1][1]:>8.1f}")
+
+    if len(windows) < 3:
+        sys.exit("run more turns than three windows to judge flatness")
+    # The first window includes warm-up (imports, caches), so compare against the second
+    (base_time, base_rss), (last_time, last_rss) = windows[1], windows[-1]
+    time_growth, rss_growth = last_time / base_time, last_rss - base_rss
+    print(f"rerun time x{time_growth:.2f}, RSS {rss_growth:+.1f} MiB between the second and last window")
+    if time_growth > args.max_time_growth or rss_growth > args.max_rss_growth:
+        sys.exit("FAIL: the session does not stay flat")
+    print("OK: rerun time and RSS stay flat")
+
+if __name__ == "__main__":
+    main()
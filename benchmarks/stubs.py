@@ -0,0 +1,58 @@
+# benchmarks/stubs.py
+"""
+Stand-ins for the parts of Streamlit, streamlit_mic_recorder and gTTS the app modules touch at import
+time, so benchmarks can call them in a plain interpreter without a Streamlit runtime or network access.
+install() must run before data_manager, chatbot, audio_cache or ui_components are imported.
+"""
+import copy
+import functools
+import hashlib
+import inspect
+import sys
+import types
+
+def _cache(copy_results):
+    """A memoizing decorator shaped like st.cache_data / st.cache_resource, with .clear()."""
+    def cache(func=None, *, max_entries=None, **_options):
+        def decorate(func):
+            signature, results = inspect.signature(func), {}
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                # Like Streamlit, parameters starting with an underscore are not part of the key
+                key = repr([(name, value) for name, value in bound.arguments.items() if not name.startswith('_')])
+                if key not in results:
+                    if max_entries and len(results) >= max_entries:
+                        results.pop(next(iter(results)))
+                    results[key] = func(*args, **kwargs)
+                return copy.deepcopy(results[key]) if copy_results else results[key]
+
+            wrapper.clear = results.clear
+            return wrapper
+        return decorate(func) if func is not None else decorate
+    return cache
+
+class FakeTTS:
+    """gTTS stand-in: deterministic MP3-sized bytes (about 1 KiB per 10 characters), no network."""
+
+    def __init__(self, text, lang='en', slow=False):
+        self.text, self.lang = text, lang
+
+    def write_to_fp(self, fp):
+        digest = hashlib.sha256(f"{self.lang}\0{self.text}".encode('utf-8')).digest()
+        fp.write(b'ID3' + digest * (1 + len(self.text) * 1024 // 10 // len(digest)))
+
+def install():
+    """Puts the stand-ins into sys.modules; returns the fake streamlit module."""
+    streamlit = types.ModuleType('streamlit')
+    streamlit.cache_data = _cache(copy_results=True)
+    streamlit.cache_resource = _cache(copy_results=False)
+    streamlit.fragment = lambda func=None, **_options: func if func is not None else (lambda func: func)
+    mic_recorder = types.ModuleType('streamlit_mic_recorder')
+    mic_recorder.speech_to_text = lambda **_options: None
+    gtts = types.ModuleType('gtts')
+    gtts.gTTS = FakeTTS
+    sys.modules.update({'streamlit': streamlit, 'streamlit_mic_recorder': mic_recorder, 'gtts': gtts})
+    return streamlit
@@ -0,0 +1,247 @@
+# benchmarks/suite.py
+"""
+Reproducible benchmarks of the request paths: find_matching_schemes, get_bot_response,
+get_eligibility_explanation and text_to_audio. Runs without Streamlit or network access (see stubs.py)
+on schemes.json and synthetic catalogues of the given sizes (up to 1M schemes), with fixed seeds. Each
+catalogue is written to a temporary schemes.json with its schemes.bin and served the production way: by a
+CatalogueWatcher on that file, with schemes read from the memory-mapped store.
+
+Every workload reports throughput and p50/p95/p99 latency of its fastest timed pass, plus peak traced
+memory from a separate, shorter pass, because tracemalloc slows everything it traces. match_shared also
+reports the recommendation cache's hit rate over a crowd of users whose profiles differ only in name,
+age and income. Results are compared
+against a stored baseline, and the exit status is 1 if any workload's throughput or memory regressed
+beyond the tolerance. The baseline depends on the machine, so CI should keep one recorded on its own
+runners (--save-baseline).
+
+Run from the repository root: python -m benchmarks.suite [--sizes 1000 10000 100000 1000000]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import stubs
+stubs.install()
+WORK_DIRECTORY = tempfile.mkdtemp(prefix='benchmarks-')
+AUDIO_DIRECTORY = os.path.join(WORK_DIRECTORY, 'audio')
+os.environ['AUDIO_CACHE_DIR'] = AUDIO_DIRECTORY  # Read when audio_cache is imported
+
+import chatbot
+import data_manager
+import scheme_store
+import ui_components
+from benchmarks.bench_intents import make_corpus
+from benchmarks.synthetic import make_catalogue, make_crowd, make_profiles, seed_schemes
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MEMORY_SAMPLE = 200  # Calls traced per workload in the memory pass
+# Throughput and peak memory decide pass or fail. Tail latency is compared and shown, but on shared CI
+# machines a single pass's p95 moves by more than any tolerance worth having.
+GATED_METRICS = ('ops_per_s', 'peak_kib', 'hit_rate')
+MIN_MEMORY_DELTA_KIB = 64  # Growth below this is noise, whatever the ratio
+# Workloads whose timings are shown but never fail the run: the cold audio path is bound by the speed of
+# the temporary filesystem its clips are written to, which varies far more than the code under test
+TIMING_NOT_GATED = {'tts_cold'}
+
+def _metrics(latencies, elapsed, peak):
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {'calls': len(latencies), 'ops_per_s': len(latencies) / elapsed, 'p50_ms': cuts[49] * 1000,
+            'p95_ms': cuts[94] * 1000, 'p99_ms': cuts[98] * 1000, 'peak_kib': peak / 1024}
+
+def _traced_peak(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(func, calls, repeats, reset=None, memory_sample=MEMORY_SAMPLE):
+    """
+    Runs func(*args) for every args in calls, repeats times, and returns the metrics of the fastest pass,
+    the least disturbed by the rest of the machine. reset() runs before every pass of a cold workload.
+    """
+    best = None
+    for _ in range(repeats):
+        if reset:
+            reset()
+        gc.collect()
+        latencies = []
+        started = time.perf_counter()
+        for args in calls:
+            call_started = time.perf_counter()
+            func(*args)
+            latencies.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[1]:
+            best = (latencies, elapsed)
+    if reset:
+        reset()
+    peak = _traced_peak(lambda: [func(*args) for args in calls[:memory_sample]])
+    return _metrics(*best, peak)
+
+def measure_once(func, repeats):
+    """Metrics of one expensive call (e.g. building a catalogue index): best untraced time, then one traced run."""
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    return _metrics([min(times)], min(times), _traced_peak(func))
+
+def write_catalogue(schemes, label):
+    """Writes schemes as a schemes.json and its schemes.bin, and points data_manager at them."""
+    directory = os.path.join(WORK_DIRECTORY, label)
+    os.makedirs(directory, exist_ok=True)
+    schemes_path, store_path = os.path.join(directory, 'schemes.json'), os.path.join(directory, 'schemes.bin')
+    with open(schemes_path, 'w', encoding='utf-8') as f:
+        json.dump(schemes, f, ensure_ascii=False)
+    scheme_store.build_store(schemes, store_path, scheme_store.file_digest(schemes_path))
+    data_manager.SCHEMES_PATH, data_manager.SCHEME_STORE_PATH = schemes_path, store_path
+
+def load_catalogue():
+    """Loads the catalogue like a fresh server process: a new watcher, empty caches, the store mapped."""
+    for cached in (data_manager.get_catalogue_watcher, data_manager.get_recommendation_cache):
+        cached.clear()
+    catalogue = data_manager.get_catalogue()
+    data_manager.get_scheme(next(iter(catalogue.schemes), ''), catalogue)
+    return catalogue
+
+def catalogue_workloads(label, schemes, version, args):
+    write_catalogue(schemes, label)
+    # Index builds are costly: large catalogues are timed once
+    build_repeats = args.repeats if len(schemes) <= 10_000 else 1
+    results = {f'catalogue_load@{label}': measure_once(load_catalogue, build_repeats)}
+    rng = random.Random(version)
+    profiles = make_profiles(args.profiles, seed=version)
+    scheme_ids = list(schemes)
+    match = lambda profile: data_manager.find_matching_schemes(profile, top_k=100)
+    matches = [(profile,) for profile in profiles]
+    cache = data_manager.get_recommendation_cache()
+    # Profiles that differ only in a name or an age bracket share a cache entry, so the cold workload empties
+    # the cache before every call to time the ranking itself
+    uncached_match = lambda profile: (cache.clear(), match(profile))
+    results[f'match@{label}'] = measure(uncached_match, matches, args.repeats)
+    for profile, in matches:
+        match(profile)  # Warms the cache the cold workload kept emptying
+    results[f'match_cached@{label}'] = measure(match, matches, args.repeats)
+    # Cross-user sharing: the cache starts empty every pass, so the hit rate is what similar users gain
+    crowd = [(profile,) for profile in make_crowd(args.profiles, seed=version)]
+    results[f'match_shared@{label}'] = measure(match, crowd, args.repeats, reset=cache.clear)
+    before = cache.stats()
+    cache.clear()
+    for profile, in crowd:
+        match(profile)
+    after = cache.stats()
+    results[f'match_shared@{label}']['hit_rate'] = (after['hits'] - before['hits']) / len(crowd)
+    explains = [(rng.choice(scheme_ids), profile, rng.choice(['en', 'hi'])) for profile in profiles]
+    results[f'explain@{label}'] = measure(chatbot.get_eligibility_explanation, explains, args.repeats)
+    return results
+
+def reset_audio_cache():
+    ui_components.get_audio_cache.clear()
+    shutil.rmtree(AUDIO_DIRECTORY, ignore_errors=True)
+
+def path_workloads(args):
+    rng = random.Random(0)
+    profiles = make_profiles(200)
+    chats = [(message, dict(rng.choice(profiles)), rng.choice(['en', 'hi'])) for message in make_corpus(args.messages)]
+    results = {'chat': measure(chatbot.get_bot_response, chats, args.repeats)}
+    texts = [(f"{message} #{i}", rng.choice(['en', 'hi'])) for i, (message, _, _) in enumerate(chats[:args.audio])]
+    # Cold: every clip is synthesized (by the stub) and written to disk; warm: served from memory
+    results['tts_cold'] = measure(ui_components.text_to_audio, texts, args.repeats, reset=reset_audio_cache)
+    results['tts_warm'] = measure(ui_components.text_to_audio, texts, args.repeats)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Prints every workload next to its baseline and returns the regressed (workload, metric) pairs."""
+    regressions = []
+    print(f"\n{'workload':<28} {'ops/s':>10} {'vs base':>8} {'p95 ms':>9} {'vs base':>8} {'peak KiB':>9} {'vs base':>8} {'hit rate':>9} {'vs base':>8}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        cells = []
+        for metric, higher_is_better, min_delta in (('ops_per_s', True, 0), ('p95_ms', False, 0), ('peak_kib', False, MIN_MEMORY_DELTA_KIB), ('hit_rate', True, 0)):
+            value = current.get(metric)
+            if value is None:
+                continue
+            if base is None or not base.get(metric):
+                cells.append(f"{value:>{10 if metric == 'ops_per_s' else 9}.{0 if metric != 'p95_ms' else 3}f} {'new':>8}"
+                             if metric != 'hit_rate' else f"{value:>9.0%} {'new':>8}")
+                continue
+            ratio = value / base[metric]
+            worse = ratio < 1 - tolerance if higher_is_better else (ratio > 1 + tolerance and value - base[metric] > min_delta)
+            worse = worse and metric in GATED_METRICS and not (name in TIMING_NOT_GATED and metric != 'peak_kib')
+            if worse:
+                regressions.append((name, metric))
+            cells.append((f"{value:>9.0%} " if metric == 'hit_rate' else f"{value:>{10 if metric == 'ops_per_s' else 9}.{0 if metric != 'p95_ms' else 3}f} ")
+                         + f"{('!' if worse else '') + f'{ratio:.2f}x':>8}")
+        print(f"{name:<28} " + " ".join(cells))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1_000, 10_000, 100_000],
+                        help="Synthetic catalogue sizes, run after schemes.json itself (1M needs several GB: about 0.4 GB of index per 100k)")
+    parser.add_argument('--profiles', type=int, default=300, help="Profiles matched and explained per catalogue")
+    parser.add_argument('--messages', type=int, default=20_000, help="Chat messages")
+    parser.add_argument('--audio', type=int, default=1_000, help="Distinct texts sent to text_to_audio")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed passes per workload; the fastest is kept")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed relative slowdown or growth")
+    parser.add_argument('--save-baseline', action='store_true', help="Record this run as the baseline")
+    parser.add_argument('--json', help="Also write this run's results to a file")
+    args = parser.parse_args()
+
+    try:
+        results = {}
+        catalogues = [('schemes.json', seed_schemes)] + [(f'{size:_}', lambda size=size: make_catalogue(size)) for size in args.sizes]
+        for version, (label, make) in enumerate(catalogues, start=1):
+            schemes = make()
+            print(f"catalogue {label}: {len(schemes):,} schemes", flush=True)
+            results.update(catalogue_workloads(label, schemes, version, args))
+            del schemes
+        results.update(path_workloads(args))
+    finally:
+        shutil.rmtree(WORK_DIRECTORY, ignore_errors=True)
+
+    run = {'config': {key: getattr(args, key) for key in ('sizes', 'profiles', 'messages', 'audio', 'repeats')},
+           'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('config') != run['config']:
+            print(f"warning: {args.baseline} was recorded with {stored.get('config')}; only matching workloads are compared")
+        baseline = stored['results']
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+            f.write('\n')
+        print(f"\nbaseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"\nno baseline at {args.baseline}; record one with --save-baseline")
+    elif regressions:
+        print(f"\nREGRESSION (>{args.tolerance:.0%}): " + ", ".join(f"{name} {metric}" for name, metric in regressions))
+        sys.exit(1)
+    else:
+        print(f"\nOK: no workload regressed beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
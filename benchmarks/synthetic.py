@@ -0,0 +1,60 @@
+# benchmarks/synthetic.py
+"""Synthetic catalogues and profiles shaped like schemes.json and the sidebar profile."""
+import json
+import random
+
+OCCUPATIONS = ["Farmer", "Student", "Business Owner", "Salaried", "Unemployed", "Other"]
+CATEGORIES = ["General", "OBC", "SC", "ST"]
+GENDERS = ["Male", "Female", "Other"]
+STATES = ["Andhra Pradesh", "Bihar", "Gujarat", "Karnataka", "Kerala", "Madhya Pradesh", "Maharashtra",
+          "Odisha", "Punjab", "Rajasthan", "Tamil Nadu", "Uttar Pradesh", "West Bengal", "Delhi"]
+
+def seed_schemes(path='schemes.json'):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def tag_vocabulary(seed, extra_tags=2000):
+    """Real tags plus profile words (so profiles hit the catalogue) plus a long tail of synthetic tags."""
+    vocab = {tag.lower() for scheme in seed.values() for tag in scheme.get("tags", [])}
+    for value in OCCUPATIONS + CATEGORIES + GENDERS + STATES:
+        vocab.update(value.lower().split())
+    vocab.update(f"tag{i}" for i in range(extra_tags))
+    return sorted(vocab)
+
+def make_catalogue(n_schemes, seed=0, tags_per_scheme=(4, 12)):
+    """Returns a catalogue of n_schemes entries built from the real ones with re-sampled tags."""
+    rng = random.Random(seed)
+    real = seed_schemes()
+    templates = list(real.values())
+    vocab = tag_vocabulary(real)
+    catalogue = {}
+    for i in range(n_schemes):
+        template = templates[i % len(templates)]
+        scheme = dict(template)
+        scheme["tags"] = rng.sample(vocab, rng.randint(*tags_per_scheme))
+        catalogue[f"SCHEME-{i:07d}"] = scheme
+    return catalogue
+
+def make_profiles(n_profiles, seed=0):
+    """Returns sidebar-shaped profiles."""
+    rng = random.Random(seed)
+    return [{
+        'name': f"Citizen {i}",
+        'age': rng.randint(18, 80),
+        'gender': rng.choice(GENDERS),
+        'state': rng.choice(STATES),
+        'category': rng.choice(CATEGORIES),
+        'income': rng.randrange(0, 1_000_000, 10_000),
+        'occupation': rng.choice(OCCUPATIONS),
+    } for i in range(n_profiles)]
+
+def make_crowd(n_profiles, n_groups=30, seed=0):
+    """
+    Profiles of many users who share an occupation, state, category and gender with others in their group
+    (Farmer / Uttar Pradesh / OBC) but have their own name, age and income, like the real user base.
+    """
+    rng = random.Random(seed)
+    groups = [{'gender': rng.choice(GENDERS), 'state': rng.choice(STATES), 'category': rng.choice(CATEGORIES),
+               'occupation': rng.choice(OCCUPATIONS)} for _ in range(n_groups)]
+    return [{**rng.choice(groups), 'name': f"Citizen {i}", 'age': rng.randint(18, 80),
+             'income': rng.randrange(0, 1_000_000, 10_000)} for i in range(n_profiles)]
@@ -0,0 +1,56 @@
+# caching.py
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache shared by every Streamlit session in the process.
+    Bounded by entry count and, when a weigher is given (e.g. len for bytes), by total weight.
+    """
+
+    def __init__(self, max_entries=1024, max_weight=None, weigher=None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigher = weigher or (lambda value: 1)
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        weight = self.weigher(value)
+        with self._lock:
+            if key in self._entries:
+                self._weight -= self.weigher(self._entries.pop(key))
+            if self.max_weight is not None and weight > self.max_weight:
+                return  # Would evict everything else and still not fit
+            self._entries[key] = value
+            self._weight += weight
+            while len(self._entries) > self.max_entries or (self.max_weight is not None and self._weight > self.max_weight):
+                _, evicted = self._entries.popitem(last=False)
+                self._weight -= self.weigher(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self):
+        """Counters for dashboards and benchmarks."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'weight': self._weight, 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def __len__(self):
+        return len(self._entries)
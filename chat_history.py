@@ -0,0 +1,79 @@
+# chat_history.py
+import json
+import os
+import tempfile
+import weakref
+from array import array
+from collections import deque
+
+MAX_MEMORY_MESSAGES = 100
+MAX_MEMORY_BYTES = 128 * 1024  # Rough UTF-8 size of the messages kept in memory per session
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class ChatHistory:
+    """
+    The chat transcript of one session with bounded memory. The newest messages stay in memory
+    (at most max_messages and max_bytes of text); older ones are spilled to a per-session JSONL file,
+    which is deleted with the session, and only read back when the user pages to them.
+    """
+
+    def __init__(self, max_messages=MAX_MEMORY_MESSAGES, max_bytes=MAX_MEMORY_BYTES, spill_dir=None):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._recent = deque()
+        self._recent_bytes = 0
+        self._spill_path = None
+        self._spill_offsets = array('Q')  # Byte offset of every spilled message in the file
+
+    def append(self, message):
+        """Adds a {'type': 'user'|'assistant', 'message': str} entry."""
+        self._recent.append(message)
+        self._recent_bytes += self._size(message)
+        while len(self._recent) > 1 and (len(self._recent) > self.max_messages or self._recent_bytes > self.max_bytes):
+            self._spill(self._recent.popleft())
+
+    @staticmethod
+    def _size(message):
+        return len(message['message'].encode('utf-8')) + 64
+
+    def _spill(self, message):
+        self._recent_bytes -= self._size(message)
+        if self._spill_path is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix='chat-', suffix='.jsonl', dir=self.spill_dir)
+            os.close(fd)
+            weakref.finalize(self, _remove_file, self._spill_path)
+        with open(self._spill_path, 'ab') as f:
+            self._spill_offsets.append(f.tell())
+            f.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def window(self, count):
+        """The last count messages, oldest first; spilled ones are read back from disk."""
+        count = min(count, len(self))
+        from_disk = count - len(self._recent)
+        if from_disk <= 0:
+            return list(self._recent)[len(self._recent) - count:]
+        earlier = []
+        with open(self._spill_path, 'rb') as f:
+            f.seek(self._spill_offsets[len(self._spill_offsets) - from_disk])
+            for _ in range(from_disk):
+                earlier.append(json.loads(f.readline()))
+        return earlier + list(self._recent)
+
+    def last(self):
+        return self._recent[-1] if self._recent else None
+
+    @property
+    def spilled(self):
+        return len(self._spill_offsets)
+
+    def __len__(self):
+        return len(self._spill_offsets) + len(self._recent)
+
+    def __bool__(self):
+        return bool(self._recent)
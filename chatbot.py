@@ -1,62 +1,124 @@
 # chatbot.py
+import re
 from localization import LANGUAGES
 import data_manager
+import instrumentation
 
+# Intent rules in priority order: (keyword table, intent, entities).
+# The keywords of each table come from every language pack in locales/, since users mix languages freely.
+INTENT_RULES = [
+    ("greeting", "greeting", {}),
+    ("farmer", "inform_occupation", {"occupation": "farmer"}),
+    ("student", "inform_occupation", {"occupation": "student"}),
+    ("business_loan", "inform_need", {"need": "business loan"}),
+    ("request_schemes", "request_schemes", {}),
+]
+
+# \w does not cover Devanagari vowel signs, so the whole block counts as part of a word
+_DEVANAGARI = r"\u0900-\u097F"
+_WORD_CHAR = rf"[\w{_DEVANAGARI}]"
+
+def _trie_pattern(keywords):
+    """
+    Spells the keywords as a character trie ("sch(?:eme(?:s)?)..."), so the regex engine walks one
+    branch per character instead of trying every keyword at every position.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # A keyword ends here
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy, so the longest keyword is tried first ("schemes" before "scheme")
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+def compile_intent_matcher(intent_keywords):
+    """
+    Compiles every intent keyword ({language: {table: keywords}}) into one trie regex and maps each
+    keyword to its rule. Keywords must start a word, which stops "hi" from firing inside "this" or "which".
+    Latin keywords may take a plural "s"/"es" (scholarships, businesses), except the two-letter ones, so
+    "hi" does not fire on "his"; Devanagari keywords may carry inflections (किसानों, छात्रों, योजनाओं), so
+    any Devanagari suffix is allowed after them. Either way the match must end a word.
+    """
+    keyword_rules = {}
+    for rule_index, (table, _, _) in enumerate(INTENT_RULES):
+        for tables in intent_keywords.values():
+            for keyword in tables.get(table, []):
+                keyword_rules.setdefault(keyword.lower(), rule_index)
+    inflected = [keyword for keyword in keyword_rules if re.search(f"[{_DEVANAGARI}]$", keyword)]
+    latin = [keyword for keyword in keyword_rules if keyword not in inflected]
+    # (keywords, suffix they may carry); each becomes one capture group
+    groups = [([keyword for keyword in latin if len(keyword) <= 2], ""),
+              ([keyword for keyword in latin if len(keyword) > 2], "(?:e?s)?"),
+              (inflected, f"[{_DEVANAGARI}]*")]
+    branches = [rf"({_trie_pattern(keywords)}){suffix}(?!{_WORD_CHAR})" if keywords else "(?!)"
+                for keywords, suffix in groups]
+    pattern = re.compile(rf"(?<!{_WORD_CHAR})(?:{'|'.join(branches)})")
+    return pattern, keyword_rules
+
+_INTENT_MATCHER = compile_intent_matcher(LANGUAGES.intent_keywords())
+
+def detect_intent(user_input, matcher=_INTENT_MATCHER):
+    """Finds every intent keyword in one pass and returns (intent, entities) of the highest-priority rule."""
+    pattern, keyword_rules = matcher
+    # Each match fills exactly one group, with the keyword as listed (without its suffix)
+    found = ["".join(groups) for groups in pattern.findall(user_input.lower())]
+    if not found:
+        return "unknown", {}
+    _, intent, entities = INTENT_RULES[min(map(keyword_rules.__getitem__, found))]
+    return intent, entities
+
+@instrumentation.timed("get_bot_response")
 def get_bot_response(user_input, user_profile, lang='en'):
-    user_input_lower = user_input.lower()
-    text = LANGUAGES[lang]
-    
     # Intent Detection
-    if any(keyword in user_input_lower for keyword in ["namaste", "hello", "hi", "नमस्ते", "हैलो"]):
-        intent = "greeting"
-    elif any(keyword in user_input_lower for keyword in ["kisan", "farmer", "kheti", "agriculture", "किसान", "खेती"]):
-        intent = "inform_occupation"; entities = {"occupation": "farmer"}
-    elif any(keyword in user_input_lower for keyword in ["student", "padhai", "college", "scholarship", "छात्र", "पढ़ाई"]):
-        intent = "inform_occupation"; entities = {"occupation": "student"}
-    elif any(keyword in user_input_lower for keyword in ["business", "vyapar", "loan", "startup", "व्यापार", "लोन"]):
-        intent = "inform_need"; entities = {"need": "business loan"}
-    elif any(keyword in user_input_lower for keyword in ["scheme", "yojana", "show schemes", "योजना", "योजनाएं"]):
-        intent = "request_schemes"
-    else:
-        intent = "unknown"
-    
-    # Response Generation
+    intent, entities = detect_intent(user_input)
+    # Occupation and need entities are remembered in the profile for the next scheme search
+    user_profile.update(entities)
+    return compose_response(intent, entities, lang)
+
+def compose_response(intent, entities, lang='en'):
+    """Response Generation: the reply depends only on the intent and its entities."""
+    text = LANGUAGES[lang]
     if intent == "greeting":
         return {"text": text['greeting_response']}
     elif intent == "inform_occupation":
-        occupation = entities.get("occupation")
-        user_profile["occupation"] = occupation
-        return {"text": text['occupation_response'].format(occupation=occupation)}
+        return {"text": text['occupation_response'].format(occupation=entities.get("occupation"))}
     elif intent == "inform_need":
-        need = entities.get("need")
-        user_profile["need"] = need
-        return {"text": text['need_response'].format(need=need)}
+        return {"text": text['need_response'].format(need=entities.get("need"))}
     elif intent == "request_schemes":
         return {"text": text['request_schemes_response'], "action": "calculate_schemes"}
     else: # Default/Unknown intent
         return {"text": text['unknown_response']}
 
+def static_responses(lang='en'):
+    """Every reply get_bot_response can give in a language, e.g. for pre-rendering their audio."""
+    responses = [compose_response(intent, entities, lang)['text'] for _, intent, entities in INTENT_RULES]
+    responses.append(compose_response("unknown", {}, lang)['text'])
+    return list(dict.fromkeys(responses))
+
+@instrumentation.timed("get_eligibility_explanation")
 def get_eligibility_explanation(scheme_id, user_profile, lang='en'):
     text = LANGUAGES[lang]
-    all_schemes = data_manager.load_schemes()
-    scheme_data = all_schemes.get(scheme_id)
+    scheme_data = data_manager.get_scheme(scheme_id)
 
     if not scheme_data:
         return "Sorry, I could not find that scheme."
 
-    profile_keywords = set()
-    for value in user_profile.values():
-        if isinstance(value, str):
-            profile_keywords.update(value.lower().split())
-
-    scheme_tags = set(tag.lower() for tag in scheme_data.get("tags", []))
-    
-    matching_reasons = profile_keywords.intersection(scheme_tags)
+    # The same reasons the dashboard shows: matched words and met eligibility criteria
+    matching_reasons = data_manager.match_reasons(scheme_id, user_profile)
     
     if not matching_reasons:
         return f"I couldn't find a specific reason for {scheme_data['name'][lang]} in your profile, but it is generally for people interested in {scheme_data['category']}."
 
-    reasons_str = ", ".join(list(matching_reasons))
+    reasons_str = ", ".join(matching_reasons)
     
     return text['eligibility_explanation'].format(
         scheme_name=scheme_data['name'][lang],
@@ -1,50 +1,245 @@
 # data_manager.py
+import functools
+import hashlib
+import heapq
 import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+from typing import NamedTuple
 import streamlit as st
+import batch_matcher
+import ranking
+import scheme_store
+from caching import LRUCache
 
-@st.cache_data
-def load_schemes():
-    """Loads scheme data from the JSON file."""
-    with open('schemes.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+SCHEMES_PATH = 'schemes.json'
+SCHEME_STORE_PATH = 'schemes.bin'  # Kept in step with SCHEMES_PATH by the catalogue watcher
+RECOMMENDATION_CACHE_SIZE = 10_000  # Distinct (keywords, page) results kept across sessions
+
+class TagIndex(NamedTuple):
+    """Inverted index from lowercase tag to the ids of the schemes carrying it, for match_schemes."""
+    postings: dict   # tag -> list of scheme ids
+    positions: dict  # scheme id -> position in the catalogue (used to break score ties)
 
-def find_matching_schemes(user_profile):
+class CatalogueSnapshot(NamedTuple):
     """
-    Finds schemes that match the user's profile based on keywords and tags.
-    This is the robust, working version of the matching logic.
+    One version of the catalogue and everything derived from it. Snapshots are never modified:
+    a request that holds one keeps a consistent view while newer versions are published.
     """
-    all_schemes = load_schemes()
-    eligible_schemes = []
+    version: int
+    digest: bytes    # sha256 of the schemes.json contents
+    schemes: Mapping  # scheme id -> scheme data: the mapped scheme store, or the parsed dict if it can't be written
+    scheme_digests: dict  # scheme id -> digest of its data, what the next reload diffs against
+    ranking: ranking.RankingIndex  # Relevance weights, built before the version is published
 
-    # Create a comprehensive set of keywords from the user's profile
-    profile_keywords = set()
-    for key, value in user_profile.items():
-        if isinstance(value, str) and value:
-            # Add the value itself (e.g., "Business Owner") and its parts ("business", "owner")
-            profile_keywords.update(value.lower().split())
+def _scheme_tags(scheme_data):
+    # A scheme is posted once per distinct tag, like the set the linear scan used to build
+    return set(tag.lower() for tag in scheme_data.get("tags", [])) if scheme_data else set()
 
-    if not profile_keywords:
-        return []
+def build_tag_index(all_schemes):
+    """Builds the tag -> scheme ids index for a catalogue."""
+    postings, positions = {}, {}
+    for position, (scheme_id, scheme_data) in enumerate(all_schemes.items()):
+        positions[scheme_id] = position
+        for tag in _scheme_tags(scheme_data):
+            postings.setdefault(tag, []).append(scheme_id)
+    return TagIndex(postings, positions)
+
+def _scheme_digests(schemes):
+    return {scheme_id: hashlib.blake2b(json.dumps(data, sort_keys=True).encode('utf-8'), digest_size=16).digest()
+            for scheme_id, data in schemes.items()}
+
+def open_scheme_store(schemes, digest, path=SCHEME_STORE_PATH):
+    """
+    Maps the scheme store at path, first (re)building it from schemes if it is missing or was built from
+    another version of schemes.json. Returns schemes itself if the store can't be written or read.
+    """
+    try:
+        store = scheme_store.SchemeStore(path)
+        if store.source_digest == digest:
+            return store
+        store.close()
+    except (OSError, ValueError):
+        pass
+    try:
+        scheme_store.build_store(schemes, path, digest)
+        store = scheme_store.SchemeStore(path)
+    except (OSError, ValueError):
+        return schemes
+    if store.source_digest != digest:
+        store.close()  # Another process published a different version in between
+        return schemes
+    return store
+
+class CatalogueWatcher:
+    """
+    Keeps the catalogue in step with schemes.json without restarts. At most every check_interval seconds
+    the file's mtime and size are compared; if they moved and the content hash changed, the schemes.bin
+    store is rebuilt, and only the schemes that differ are applied to the ranking index of the current
+    snapshot, which is then published as a new version. Checks run on a background thread: requests keep
+    the current version until the next one is fully built.
+
+    Scheme data is served from the memory-mapped store, shared with every other process through the page
+    cache; the parsed JSON is only held while a version is built.
+    """
+
+    def __init__(self, path=SCHEMES_PATH, check_interval=1.0, store_path=SCHEME_STORE_PATH):
+        self.path = path
+        self.store_path = store_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stat = self._stat_key()
+        with open(path, 'rb') as f:
+            content = f.read()
+        schemes, digest = json.loads(content), hashlib.sha256(content).digest()
+        self._snapshot = CatalogueSnapshot(1, digest, open_scheme_store(schemes, digest, store_path),
+                                           _scheme_digests(schemes), ranking.build_ranking_index(schemes))
+        self._next_check = time.monotonic() + check_interval
+
+    def _stat_key(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def snapshot(self):
+        """The newest published catalogue version; starts a background check if the file may have changed."""
+        now = time.monotonic()
+        if now >= self._next_check and not self._lock.locked():
+            self._next_check = now + self.check_interval  # Claimed here, so one request starts the check
+            threading.Thread(target=self.check, name='catalogue-check', daemon=True).start()
+        return self._snapshot
+
+    def check(self):
+        """Applies any change in the file to a new snapshot; returns True if a new version was published."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                stat = self._stat_key()
+                if stat == self._stat:
+                    return False
+                with open(self.path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).digest()
+                if digest == self._snapshot.digest:
+                    self._stat = stat
+                    return False
+                new_schemes = json.loads(content)
+            except (OSError, ValueError):
+                return False  # Missing or half-written file: keep serving the current version and retry later
+            self._stat = stat
+            self._snapshot = self.apply(self._snapshot, new_schemes, digest)
+            return True
+
+    def apply(self, snapshot, new_schemes, digest):
+        """Builds the next snapshot from the per-scheme diff between snapshot and new_schemes."""
+        old_digests, scheme_digests = snapshot.scheme_digests, _scheme_digests(new_schemes)
+        changed_ids = [sid for sid in old_digests if sid not in scheme_digests]
+        changed_ids += [sid for sid, data_digest in scheme_digests.items() if old_digests.get(sid) != data_digest]
+        # The old store stays mapped for readers of the old snapshot, whatever replaces the file
+        ranking_index = ranking.update_ranking_index(snapshot.ranking, snapshot.schemes, new_schemes, changed_ids)
+        schemes = open_scheme_store(new_schemes, digest, self.store_path)
+        return CatalogueSnapshot(snapshot.version + 1, digest, schemes, scheme_digests, ranking_index)
+
+@st.cache_resource
+def get_catalogue_watcher():
+    """One watcher per server process, shared by every session."""
+    return CatalogueWatcher(SCHEMES_PATH, store_path=SCHEME_STORE_PATH)
 
-    for scheme_id, scheme_data in all_schemes.items():
-        # Get all tags for the current scheme
-        scheme_tags = set(tag.lower() for tag in scheme_data.get("tags", []))
+def get_catalogue():
+    """The current catalogue snapshot; keep using the same one for the whole request."""
+    return get_catalogue_watcher().snapshot()
 
-        # Find the keywords from the user's profile that are present in the scheme's tags
-        common_tags = profile_keywords.intersection(scheme_tags)
+def load_schemes():
+    """Returns the current scheme data (shared between sessions, so treat it as read-only)."""
+    return get_catalogue().schemes
+
+def get_scheme(scheme_id, catalogue=None):
+    """Looks one scheme up by id without copying the catalogue; None if there is no such scheme."""
+    return (catalogue or get_catalogue()).schemes.get(scheme_id)
+
+def profile_keywords(user_profile):
+    """Creates a comprehensive (frozen) set of keywords from the user's profile."""
+    return _tokenize_values(tuple(value for value in user_profile.values() if isinstance(value, str) and value))
 
-        # If there is at least one match, the scheme is eligible
-        if common_tags:
-            # A simple scoring logic: more matches = higher score
-            score = min(len(common_tags) * 35, 100) # Capped at 100
+@functools.lru_cache(maxsize=4096)
+def _tokenize_values(values):
+    # Profiles change rarely between reruns, so each distinct set of values is only tokenized once
+    keywords = set()
+    for value in values:
+        # Add the parts of each value (e.g., "Business Owner" -> "business", "owner")
+        keywords.update(value.lower().split())
+    return frozenset(keywords)
 
-            eligible_schemes.append({
-                'id': scheme_id,
-                'data': scheme_data,
-                'score': score,
-                'reasons': [tag.capitalize() for tag in common_tags] # Store the reasons for eligibility
-            })
+def match_schemes(keywords, tag_index, top_k=None, offset=0):
+    """
+    Scores every scheme sharing at least one tag with the keywords by the number of shared tags
+    (35 points each, capped at 100). This is the score batch_matcher computes; find_matching_schemes ranks with ranking.py.
+    Only the posting lists of the keywords are visited, so the cost does not grow with the catalogue.
+    With top_k, only the best offset + top_k matches are kept (in a bounded heap) and the page
+    starting at offset is returned.
+    """
+    common_tags = {}
+    for keyword in keywords:
+        for scheme_id in tag_index.postings.get(keyword, ()):
+            common_tags.setdefault(scheme_id, []).append(keyword)
 
-    # Sort the results by the highest score first
-    eligible_schemes.sort(key=lambda x: x['score'], reverse=True)
-    return eligible_schemes
\ No newline at end of file
+    # Highest score first; ties keep catalogue order, as the stable sort over the full scan did
+    positions = tag_index.positions
+    rank = lambda item: (-min(len(item[1]) * 35, 100), positions[item[0]])
+    if top_k is None:
+        ranked = sorted(common_tags.items(), key=rank)[offset:]
+    else:
+        ranked = heapq.nsmallest(offset + top_k, common_tags.items(), key=rank)[offset:]
+
+    # Lightweight records: the scheme itself is looked up by id only when it is displayed
+    return [{
+        'id': scheme_id,
+        'score': min(len(tags) * 35, 100), # Capped at 100
+        'reasons': [tag.capitalize() for tag in tags] # Store the reasons for eligibility
+    } for scheme_id, tags in ranked]
+
+@st.cache_resource
+def get_recommendation_cache():
+    """
+    Match results shared by every session. Many users submit similar profiles, and matching only depends
+    on the profile words the catalogue knows, the criteria its numbers meet or fail (ranking.query_key)
+    and the catalogue version, so only those are part of the key: profiles that differ in a name or by a
+    few rupees share an entry, and results computed against an older catalogue can never be returned.
+    Hit rates are in get_recommendation_cache().stats().
+    """
+    return LRUCache(max_entries=RECOMMENDATION_CACHE_SIZE)
+
+def find_matching_schemes(user_profile, top_k=None, offset=0):
+    """
+    Finds schemes that match the user's profile, ranked by relevance (see ranking.py).
+    Returns {'id', 'score', 'reasons'} records, best first, optionally limited to one page.
+    """
+    keywords, numbers = profile_keywords(user_profile), ranking.profile_numbers(user_profile)
+    if not keywords and not numbers:
+        return []
+    catalogue = get_catalogue()
+    key = (catalogue.version, ranking.query_key(keywords, numbers, catalogue.ranking), top_k, offset)
+    cache = get_recommendation_cache()
+    matches = cache.get(key)
+    if matches is None:
+        # Cached records are shared by every session, so their reasons are frozen as tuples
+        matches = tuple({**match, 'reasons': tuple(match['reasons'])}
+                        for match in ranking.rank_schemes(keywords, numbers, catalogue.ranking, top_k=top_k, offset=offset))
+        cache.put(key, matches)
+    # Each caller gets its own records, reasons list included
+    return [{**match, 'reasons': list(match['reasons'])} for match in matches]
+
+def match_reasons(scheme_id, user_profile):
+    """Why scheme_id matches the profile: the reasons find_matching_schemes gives it, or [] if it does not."""
+    return ranking.explain_scheme(profile_keywords(user_profile), ranking.profile_numbers(user_profile), get_catalogue().ranking, scheme_id)
+
+def find_matching_schemes_batch(profiles_path, output_path, chunk_size=batch_matcher.DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Batch eligibility for a CSV of profiles, processed chunk by chunk (on a pool of worker processes
+    when workers > 1). Scores are the tag-count scores of match_schemes, not the relevance ranking.
+    Writes (profile_id, scheme_id, score) rows to a Parquet or CSV file and returns the row count.
+    """
+    # Worker processes get a plain copy of the tags, the only field the batch scores read
+    all_schemes = {scheme_id: {'tags': list(data.get('tags', []))} for scheme_id, data in load_schemes().items()}
+    return batch_matcher.run_batch(all_schemes, profiles_path, output_path, chunk_size, workers)
@@ -0,0 +1,103 @@
+# instrumentation.py
+"""
+Opt-in timing of the app's rerun stages. Enable with APP_PROFILE=1 (and APP_PROFILE_JSONL=path to
+also append every rerun to a JSONL file). When disabled, timed() returns functions unchanged and
+span() returns one shared no-op context manager, so the cost is a single call.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+ENABLED = os.environ.get('APP_PROFILE', '') not in ('', '0')
+JSONL_PATH = os.environ.get('APP_PROFILE_JSONL')
+RECENT_RERUNS = 50
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_histograms = {}  # stage -> [bucket counts..., +Inf count], plus sums and counts below
+_sums, _counts = {}, {}
+_recent = deque(maxlen=RECENT_RERUNS)
+_current = threading.local()  # Each Streamlit session runs its script in its own thread
+
+def observe(stage, seconds):
+    """Adds one duration to the stage's histogram and to the rerun in progress on this thread, if any."""
+    with _lock:
+        counts = _histograms.setdefault(stage, [0] * (len(BUCKETS) + 1))
+        counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        _sums[stage] = _sums.get(stage, 0.0) + seconds
+        _counts[stage] = _counts.get(stage, 0) + 1
+    stages = getattr(_current, 'stages', None)
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+@contextmanager
+def _span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+def span(stage):
+    """Context manager timing a block as one stage."""
+    return _span(stage) if ENABLED else _NOOP
+
+def timed(stage):
+    """Decorator timing every call of a function as one stage."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def rerun():
+    """Wraps one execution of the Streamlit script; ends cleanly on st.rerun()/st.stop() too."""
+    if not ENABLED:
+        yield
+        return
+    _current.stages = {}
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - started
+        record = {'time': time.time(), 'total': total, 'stages': _current.stages}
+        _current.stages = None
+        observe('rerun', total)
+        with _lock:
+            _recent.append(record)
+        if JSONL_PATH:
+            with _lock, open(JSONL_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+def recent_reruns():
+    """The last RECENT_RERUNS reruns of the process, newest first."""
+    with _lock:
+        return list(reversed(_recent))
+
+def prometheus_text():
+    """Every stage histogram in the Prometheus text exposition format."""
+    lines = ["# HELP app_stage_seconds Time spent in each stage of a Streamlit rerun.",
+             "# TYPE app_stage_seconds histogram"]
+    with _lock:
+        for stage in sorted(_histograms):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float('inf'),), _histograms[stage]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'app_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'app_stage_seconds_sum{{stage="{stage}"}} {_sums[stage]}')
+            lines.append(f'app_stage_seconds_count{{stage="{stage}"}} {_counts[stage]}')
+    return "\n".join(lines) + "\n"
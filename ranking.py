@@ -0,0 +1,312 @@
+# ranking.py
+"""
+Relevance ranking for scheme recommendations.
+
+Each scheme is scored like a BM25F document with three fields: its tags, its category and the words of
+its eligibility criteria. Rare terms weigh more than common ones (IDF), repeated terms saturate, and long
+fields are normalized. The saturated, length-normalized frequency of every (term, scheme) pair is
+precomputed into postings; the IDF, which depends on how many schemes a term is in, is applied when a
+query reads a term's list. A query adds up the postings of its words, never visits schemes that share
+none of them, and skips lists that cannot change its top k.
+
+Because no stored weight depends on the rest of the catalogue except through the average field lengths,
+a catalogue edit only touches the postings of the schemes that changed (update_ranking_index). The
+averages are kept from the last full build until the catalogue drifts too far from them.
+
+Numeric criteria written into the eligibility text ("Age 18-40", "Income below Rs 2 lakh") are parsed
+at build time and checked against the numbers in the profile: a scheme whose criterion the profile fails
+is dropped. Meeting its criteria never makes a scheme a match on its own; it only adds a small bonus, less
+than any single word hit, to a scheme already matched by the profile's words.
+"""
+import heapq
+import math
+import re
+from typing import NamedTuple
+
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {'tags': 1.0, 'category': 0.6, 'eligibility': 0.4}
+NUMERIC_FIELDS = ('age', 'income')
+CRITERION_BONUS = 0.25  # Bonus for meeting a scheme's numeric criteria, as a share of the query's weakest word hit
+REBUILD_DRIFT = 0.1  # Relative change of an average field length that makes an update rebuild the index
+STOPWORDS = frozenset("a an and are as at be by do for from has have in is not of on or the their to who with".split())
+
+_TOKEN = re.compile(r"[\w\u0900-\u097F]+")
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?)"
+_UNIT = r"\s*(lakhs?|lacs?|crores?|k)?\b"
+_UNITS = {'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'lacs': 100_000, 'crore': 10_000_000, 'crores': 10_000_000, 'k': 1_000}
+_AT_MOST = r"(?:below|under|up\s*to|upto|less\s+than|not\s+exceeding|maximum(?:\s+of)?|max\.?)"
+_AT_LEAST = r"(?:above|over|at\s+least|more\s+than|minimum(?:\s+of)?|min\.?)"
+_CURRENCY = r"(?:rs\.?|inr|₹)?\s*"
+# (field, bound, pattern); bound is 'range', 'max' or 'min'
+_CRITERIA_PATTERNS = [
+    ('age', 'range', re.compile(rf"(?:\bage[ds]?|आयु|उम्र)\s*(?:of\s+|between\s+)?{_NUMBER}\s*(?:-|–|to|and)\s*{_NUMBER}", re.I)),
+    ('age', 'max', re.compile(rf"\bage[ds]?\s+{_AT_MOST}\s+{_NUMBER}", re.I)),
+    ('age', 'min', re.compile(rf"\bage[ds]?\s+{_AT_LEAST}\s+{_NUMBER}", re.I)),
+    ('income', 'max', re.compile(rf"\bincome\b[^\d₹]*?{_AT_MOST}\s+{_CURRENCY}{_NUMBER}{_UNIT}", re.I)),
+    ('income', 'min', re.compile(rf"\bincome\b[^\d₹]*?{_AT_LEAST}\s+{_CURRENCY}{_NUMBER}{_UNIT}", re.I)),
+]
+
+class Criterion(NamedTuple):
+    """A numeric eligibility condition, low <= profile[field] <= high."""
+    field: str
+    low: float
+    high: float
+
+    def check(self, value):
+        return self.low <= value <= self.high
+
+class RankingIndex(NamedTuple):
+    """
+    Precomputed weights for one catalogue version. Never modified: an update builds a new index that
+    shares every posting list it does not change.
+    """
+    postings: dict   # term -> {scheme id: saturated term frequency}; times the term's IDF, its impact
+    tf_bounds: dict  # term -> (lowest, highest) saturated term frequency in its postings
+    criteria: dict   # Criterion -> {scheme id: eligibility line it was parsed from}
+    scheme_criteria: dict  # scheme id -> the Criterion entries it has
+    positions: dict  # scheme id -> position in the catalogue (used to break score ties)
+    field_lengths: dict  # field -> tokens in that field over the whole catalogue
+    average_lengths: dict  # field -> average length the term frequencies were normalized with
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+def _amount(number, unit=None):
+    return float(number.replace(',', '')) * _UNITS.get((unit or '').lower(), 1)
+
+def parse_criteria(lines):
+    """Extracts the numeric criteria from eligibility lines, as a Criterion -> line dict."""
+    criteria = {}
+    for line in lines:
+        for field, bound, pattern in _CRITERIA_PATTERNS:
+            match = pattern.search(line)
+            if not match:
+                continue
+            if bound == 'range':
+                low, high = sorted((_amount(match[1]), _amount(match[2])))
+            elif bound == 'max':
+                low, high = 0.0, _amount(*match.groups())
+            else:
+                low, high = _amount(*match.groups()), math.inf
+            # The same condition usually appears once per language; keep the first (English) label
+            criteria.setdefault(Criterion(field, low, high), line)
+    return criteria
+
+def _scheme_fields(scheme_data):
+    eligibility = [line for lines in scheme_data.get("eligibility", {}).values() for line in lines]
+    return {
+        'tags': [token for tag in scheme_data.get("tags", []) for token in tokenize(tag)],
+        'category': tokenize(scheme_data.get("category", "")),
+        'eligibility': [token for line in eligibility for token in tokenize(line)],
+    }, eligibility
+
+def _idf(df, n_docs):
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+def _scheme_terms(fields, average_lengths):
+    """term -> saturated, length-normalized, field-weighted frequency of the term in one scheme."""
+    weighted_tf = {}
+    for field, tokens in fields.items():
+        if not tokens:
+            continue
+        norm = FIELD_WEIGHTS[field] / (1 - B + B * len(tokens) / average_lengths[field])
+        for token in tokens:
+            weighted_tf[token] = weighted_tf.get(token, 0.0) + norm
+    return {term: tf * (K1 + 1) / (tf + K1) for term, tf in weighted_tf.items()}
+
+def _average_lengths(field_lengths, n_docs):
+    return {field: max(total / max(n_docs, 1), 1.0) for field, total in field_lengths.items()}
+
+def build_ranking_index(all_schemes):
+    """Computes the saturated frequency of every (term, scheme) pair and parses the numeric criteria."""
+    documents, criteria, scheme_criteria, positions = {}, {}, {}, {}
+    field_lengths = dict.fromkeys(FIELD_WEIGHTS, 0)
+    for position, (scheme_id, scheme_data) in enumerate(all_schemes.items()):
+        positions[scheme_id] = position
+        fields, eligibility = _scheme_fields(scheme_data)
+        documents[scheme_id] = fields
+        for field, tokens in fields.items():
+            field_lengths[field] += len(tokens)
+        if parsed := parse_criteria(eligibility):
+            scheme_criteria[scheme_id] = tuple(parsed)
+            for criterion, line in parsed.items():
+                criteria.setdefault(criterion, {})[scheme_id] = line
+
+    average_lengths = _average_lengths(field_lengths, len(documents))
+    postings = {}
+    for scheme_id, fields in documents.items():
+        for term, tf in _scheme_terms(fields, average_lengths).items():
+            postings.setdefault(term, {})[scheme_id] = tf
+    tf_bounds = {term: (min(per_scheme.values()), max(per_scheme.values())) for term, per_scheme in postings.items()}
+    return RankingIndex(postings, tf_bounds, criteria, scheme_criteria, positions, field_lengths, average_lengths)
+
+def update_ranking_index(ranking_index, old_schemes, new_schemes, changed_ids):
+    """
+    Returns the index of new_schemes, given the index of old_schemes and the ids that were added, removed
+    or edited. Only the posting lists of the terms and criteria those schemes had or have are copied and
+    updated; all others are shared with the old index, which stays valid for readers still using it.
+    Falls back to a full build once an average field length has drifted by more than REBUILD_DRIFT.
+    """
+    postings, tf_bounds = dict(ranking_index.postings), dict(ranking_index.tf_bounds)
+    criteria, scheme_criteria = dict(ranking_index.criteria), dict(ranking_index.scheme_criteria)
+    positions, field_lengths = dict(ranking_index.positions), dict(ranking_index.field_lengths)
+    average_lengths = ranking_index.average_lengths
+    next_position = max(positions.values(), default=-1) + 1
+    copied_terms, copied_criteria = set(), set()
+
+    def own(table, copied, key):
+        # Copy-on-write: a posting list is copied the first time this update changes it
+        if key not in copied:
+            table[key] = dict(table.get(key, ()))
+            copied.add(key)
+        return table[key]
+
+    for scheme_id in changed_ids:
+        if scheme_id in old_schemes:
+            fields, _ = _scheme_fields(old_schemes[scheme_id])
+            for field, tokens in fields.items():
+                field_lengths[field] -= len(tokens)
+            for term in _scheme_terms(fields, average_lengths):
+                own(postings, copied_terms, term).pop(scheme_id, None)
+            for criterion in scheme_criteria.pop(scheme_id, ()):
+                own(criteria, copied_criteria, criterion).pop(scheme_id, None)
+        if scheme_id not in new_schemes:
+            positions.pop(scheme_id, None)
+            continue
+        fields, eligibility = _scheme_fields(new_schemes[scheme_id])
+        for field, tokens in fields.items():
+            field_lengths[field] += len(tokens)
+        for term, tf in _scheme_terms(fields, average_lengths).items():
+            own(postings, copied_terms, term)[scheme_id] = tf
+        if parsed := parse_criteria(eligibility):
+            scheme_criteria[scheme_id] = tuple(parsed)
+            for criterion, line in parsed.items():
+                own(criteria, copied_criteria, criterion)[scheme_id] = line
+        if scheme_id not in positions:
+            positions[scheme_id] = next_position; next_position += 1  # New schemes rank after existing ones on ties
+
+    current = _average_lengths(field_lengths, len(positions))
+    if any(abs(current[field] / average_lengths[field] - 1) > REBUILD_DRIFT for field in FIELD_WEIGHTS):
+        return build_ranking_index(new_schemes)
+    for term in copied_terms:
+        if postings[term]:
+            tf_bounds[term] = (min(postings[term].values()), max(postings[term].values()))
+        else:
+            del postings[term], tf_bounds[term]
+    for criterion in copied_criteria:
+        if not criteria[criterion]:
+            del criteria[criterion]
+    return RankingIndex(postings, tf_bounds, criteria, scheme_criteria, positions, field_lengths, average_lengths)
+
+def profile_numbers(user_profile):
+    """The numeric profile values the criteria are checked against, as a hashable tuple."""
+    numbers = []
+    for field in NUMERIC_FIELDS:
+        value = user_profile.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers.append((field, value))
+    return tuple(numbers)
+
+def _check_criteria(numbers, ranking_index):
+    """Splits the catalogue's criteria on the fields the profile has values for into (met, failed) sets."""
+    numbers, met, failed = dict(numbers), set(), set()
+    for criterion in ranking_index.criteria:
+        # A field missing from the profile is neither a reason nor a disqualification
+        if criterion.field in numbers:
+            (met if criterion.check(numbers[criterion.field]) else failed).add(criterion)
+    return met, failed
+
+def query_key(keywords, numbers, ranking_index):
+    """
+    The parts of a query that can change its ranking: the words the catalogue has postings for, and which
+    of its criteria the numbers meet or fail. Queries with equal keys get the same results, whatever
+    else differs between the profiles (a name, an income that falls in the same brackets).
+    """
+    met, failed = _check_criteria(numbers, ranking_index)
+    return frozenset(keyword for keyword in keywords if keyword in ranking_index.postings), frozenset(met), frozenset(failed)
+
+def _reasons(scheme_id, keywords, met, ranking_index):
+    """The matched words (capitalized), then the eligibility lines of the met criteria, of one scheme."""
+    reasons = [keyword.capitalize() for keyword in keywords if scheme_id in ranking_index.postings[keyword]]
+    reasons.extend(ranking_index.criteria[criterion][scheme_id]
+                   for criterion in ranking_index.scheme_criteria.get(scheme_id, ()) if criterion in met)
+    return reasons
+
+def _weighted_keywords(keywords, ranking_index):
+    """(keyword, IDF) of the profile words the catalogue has postings for, highest possible impact first."""
+    n_docs, postings, tf_bounds = len(ranking_index.positions), ranking_index.postings, ranking_index.tf_bounds
+    weighted = [(keyword, _idf(len(postings[keyword]), n_docs)) for keyword in keywords if keyword in postings]
+    weighted.sort(key=lambda item: item[1] * tf_bounds[item[0]][1], reverse=True)
+    return weighted
+
+def explain_scheme(keywords, numbers, ranking_index, scheme_id):
+    """
+    The reasons rank_schemes gives for scheme_id with this profile, in the same order; empty if the scheme
+    is not a match (no word in common, or a numeric criterion the profile fails).
+    """
+    met, failed = _check_criteria(numbers, ranking_index)
+    if failed.intersection(ranking_index.scheme_criteria.get(scheme_id, ())):
+        return []
+    keywords = [keyword for keyword, _ in _weighted_keywords(keywords, ranking_index)]
+    if not any(scheme_id in ranking_index.postings[keyword] for keyword in keywords):
+        return []
+    return _reasons(scheme_id, keywords, met, ranking_index)
+
+def rank_schemes(keywords, numbers, ranking_index, top_k=None, offset=0):
+    """
+    Ranks the schemes matching the profile words (keywords), filtered and nudged by its numeric values
+    (profile_numbers). Returns {'id', 'score', 'reasons'} records, best first; scores are relative to the
+    best match (100).
+
+    With top_k, only the page of top_k records starting at offset is kept, and the posting lists are read
+    highest-impact first (MaxScore): once the k-th best score beats what a scheme could still collect from
+    the lists not yet read, those lists, typically the long ones of common words, are skipped.
+    """
+    weighted = _weighted_keywords(keywords, ranking_index)
+    keywords = [keyword for keyword, _ in weighted]
+    # One entry per matched word: (highest impact, IDF, scheme id -> saturated term frequency)
+    entries = [(idf * ranking_index.tf_bounds[keyword][1], idf, ranking_index.postings[keyword]) for keyword, idf in weighted]
+    # Distinct criteria are few; a failed one rules its schemes out, met ones earn the bonus. Every match
+    # has at least one word hit, none weaker than the weakest in these lists, so the bonus stays below it.
+    met, failed = _check_criteria(numbers, ranking_index)
+    weakest_hit = min((idf * ranking_index.tf_bounds[keyword][0] for keyword, idf in weighted), default=0.0)
+    bonus = CRITERION_BONUS * weakest_hit if met else 0.0
+
+    positions, scheme_criteria = ranking_index.positions, ranking_index.scheme_criteria
+    k = None if top_k is None else offset + top_k
+    heap, seen = [], set()  # Min-heap of (score, -position, scheme id): the worst kept match on top
+    for i, (_, _, schemes) in enumerate(entries):
+        # The most a scheme not seen yet can score, summed in the same order as its score would be
+        if k is not None and len(heap) >= k and sum(entry[0] for entry in entries[i:]) + bonus < heap[0][0]:
+            break
+        for scheme_id in schemes:
+            if scheme_id in seen:
+                continue
+            seen.add(scheme_id)
+            criteria = scheme_criteria.get(scheme_id, ())
+            if failed and failed.intersection(criteria):
+                continue
+            score = 0.0
+            for _, idf, frequencies in entries:
+                tf = frequencies.get(scheme_id)
+                if tf is not None:
+                    score += idf * tf
+            if met and not met.isdisjoint(criteria):
+                score += bonus
+            item = (score, -positions[scheme_id], scheme_id)
+            if k is None or len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+    if not heap:
+        return []
+
+    # Highest score first; ties keep catalogue order
+    ranked = sorted(heap, reverse=True)
+    best = ranked[0][0]
+    return [{
+        'id': scheme_id,
+        'score': max(1, round(100 * score / best)),
+        'reasons': _reasons(scheme_id, keywords, met, ranking_index),
+    } for score, _, scheme_id in ranked[offset:]]
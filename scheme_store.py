@@ -0,0 +1,260 @@
+# scheme_store.py
+"""
+Compact binary form of schemes.json, read through mmap.
+
+Every process maps the same file, so the catalogue lives once in the OS page cache instead of once per
+process (and once more per Streamlit cache access). Tags are interned to integer ids and all strings sit
+in one UTF-8 pool addressed by (offset, length), so looking a scheme up by id only decodes the fields
+that are actually read.
+
+Servers build and refresh it themselves whenever they load a new version of schemes.json
+(data_manager.CatalogueWatcher). To build it ahead of time: python scheme_store.py [schemes.json] [schemes.bin]
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Mapping
+
+MAGIC = b'SCHM'
+VERSION = 1
+# magic, version, languages, schemes, tags, list entries, tag entries, sha256 of the source JSON
+HEADER = struct.Struct('<4sHHIIII32s')
+REF = struct.Struct('<II')  # (offset into the string pool, length); MISSING length marks an absent field
+MISSING = 0xFFFFFFFF
+SCALAR_FIELDS = ("category", "benefit", "application_link", "contact", "contact_link")
+LOCALIZED_FIELDS = ("name", "description")
+LOCALIZED_LISTS = ("eligibility",)
+
+def _record_struct(n_langs):
+    # id, scalar fields, localized fields per language, (start, count) of each localized list
+    # per language, (start, count) of the tag ids, catalogue position
+    refs = 1 + len(SCALAR_FIELDS) + len(LOCALIZED_FIELDS) * n_langs + len(LOCALIZED_LISTS) * n_langs + 1
+    return struct.Struct('<' + 'II' * refs + 'I')
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+def build_store(all_schemes, out_path, source_digest=b'\0' * 32):
+    """Writes the catalogue in the binary format; records are sorted by id for binary search."""
+    languages = list(dict.fromkeys(lang for scheme in all_schemes.values()
+                                   for field in LOCALIZED_FIELDS + LOCALIZED_LISTS for lang in scheme.get(field, {})))
+    pool, pool_offsets = bytearray(), {}
+
+    def ref(value):
+        if value is None:
+            return (0, MISSING)
+        data = str(value).encode('utf-8')
+        if data not in pool_offsets:
+            pool_offsets[data] = len(pool)
+            pool.extend(data)
+        return (pool_offsets[data], len(data))
+
+    tag_table = {}
+    list_entries, tag_entries, records = [], [], []
+    positions = {scheme_id: position for position, scheme_id in enumerate(all_schemes)}
+    for scheme_id in sorted(all_schemes, key=lambda sid: sid.encode('utf-8')):
+        scheme = all_schemes[scheme_id]
+        fields = [ref(scheme_id)]
+        fields += [ref(scheme.get(field)) for field in SCALAR_FIELDS]
+        fields += [ref(scheme.get(field, {}).get(lang)) for field in LOCALIZED_FIELDS for lang in languages]
+        for field in LOCALIZED_LISTS:
+            for lang in languages:
+                values = scheme.get(field, {}).get(lang, [])
+                fields.append((len(list_entries), len(values)))
+                list_entries.extend(ref(value) for value in values)
+        tags = scheme.get("tags", [])
+        fields.append((len(tag_entries), len(tags)))
+        tag_entries.extend(tag_table.setdefault(tag, len(tag_table)) for tag in tags)
+        records.append((fields, positions[scheme_id]))
+
+    tag_refs = [ref(tag) for tag in tag_table]
+    lang_refs = [ref(lang) for lang in languages]
+    record_struct = _record_struct(len(languages))
+    # Running servers have the current file mapped: write a new file and swap it in with a rename, so
+    # they keep reading the old inode (never truncated under them) until they map the new one
+    fd, tmp_path = tempfile.mkstemp(prefix='.schemes-', suffix='.tmp', dir=os.path.dirname(os.path.abspath(out_path)))
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp creates owner-only files; the store is read by every server process
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(languages), len(records), len(tag_table),
+                                len(list_entries), len(tag_entries), source_digest))
+            for offset, length in lang_refs + tag_refs:
+                f.write(REF.pack(offset, length))
+            for fields, position in records:
+                f.write(record_struct.pack(*(value for pair in fields for value in pair), position))
+            for offset, length in list_entries:
+                f.write(REF.pack(offset, length))
+            f.write(struct.pack(f'<{len(tag_entries)}I', *tag_entries))
+            f.write(pool)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class SchemeRecord(Mapping):
+    """
+    One scheme, shaped like its schemes.json entry (record['name']['en'], record['tags'], ...).
+    Nothing is decoded until a field is read.
+    """
+
+    def __init__(self, store, index):
+        self._store = store
+        self._fields = store._record_struct.unpack_from(store._buffer, store._records_offset + index * store._record_struct.size)
+
+    def _ref(self, slot):
+        return self._store._string(self._fields[2 * slot], self._fields[2 * slot + 1])
+
+    def __getitem__(self, key):
+        store, langs = self._store, self._store.languages
+        if key in SCALAR_FIELDS:
+            value = self._ref(1 + SCALAR_FIELDS.index(key))
+            if value is None:
+                raise KeyError(key)
+            return value
+        if key in LOCALIZED_FIELDS:
+            base = 1 + len(SCALAR_FIELDS) + LOCALIZED_FIELDS.index(key) * len(langs)
+            return {lang: value for i, lang in enumerate(langs) if (value := self._ref(base + i)) is not None}
+        if key in LOCALIZED_LISTS:
+            base = 1 + len(SCALAR_FIELDS) + len(LOCALIZED_FIELDS) * len(langs) + LOCALIZED_LISTS.index(key) * len(langs)
+            lists = {}
+            for i, lang in enumerate(langs):
+                start, count = self._fields[2 * (base + i)], self._fields[2 * (base + i) + 1]
+                if count:
+                    lists[lang] = [store._list_entry(start + j) for j in range(count)]
+            return lists
+        if key == "tags":
+            return [store.tags[tag_id] for tag_id in self.tag_ids]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (key for key in LOCALIZED_FIELDS + SCALAR_FIELDS + LOCALIZED_LISTS + ("tags",) if key in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    @property
+    def id(self):
+        return self._ref(0)
+
+    @property
+    def position(self):
+        """Index of the scheme in the source catalogue's order."""
+        return self._fields[-1]
+
+    @property
+    def tag_ids(self):
+        """The interned tag ids, as a zero-copy view into the mapped file."""
+        start, count = self._fields[-3], self._fields[-2]
+        return self._store._tag_ids[start:start + count]
+
+class SchemeStore(Mapping):
+    """
+    Read-only, memory-mapped catalogue: a scheme id -> SchemeRecord mapping that iterates in catalogue
+    order. get(scheme_id) is a binary search over the records, which are sorted by id.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, version, n_langs, self._n_schemes, n_tags, n_lists, n_tag_entries, self.source_digest = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} scheme store")
+        self._record_struct = _record_struct(n_langs)
+        offset = HEADER.size
+        self._table_offset = offset
+        offset += (n_langs + n_tags) * REF.size
+        self._records_offset = offset
+        offset += self._n_schemes * self._record_struct.size
+        self._lists_offset = offset
+        offset += n_lists * REF.size
+        self._tag_ids = self._buffer[offset:offset + 4 * n_tag_entries].cast('I')
+        self._pool_offset = offset + 4 * n_tag_entries
+        self.languages = [self._table_string(i) for i in range(n_langs)]
+        self.tags = [self._table_string(n_langs + i) for i in range(n_tags)]
+        self._order = None  # Record indexes in catalogue order, worked out on the first iteration
+
+    def _string(self, offset, length):
+        if length == MISSING:
+            return None
+        start = self._pool_offset + offset
+        return str(self._buffer[start:start + length], 'utf-8')
+
+    def _table_string(self, index):
+        return self._string(*REF.unpack_from(self._buffer, self._table_offset + index * REF.size))
+
+    def _list_entry(self, index):
+        return self._string(*REF.unpack_from(self._buffer, self._lists_offset + index * REF.size))
+
+    def _id_bytes(self, index):
+        offset, length = REF.unpack_from(self._buffer, self._records_offset + index * self._record_struct.size)
+        start = self._pool_offset + offset
+        return self._buffer[start:start + length]
+
+    def _find(self, scheme_id):
+        key = scheme_id.encode('utf-8')
+        low, high = 0, self._n_schemes
+        while low < high:
+            middle = (low + high) // 2
+            if self._id_bytes(middle).tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._n_schemes and self._id_bytes(low) == key:
+            return low
+        return None
+
+    def get(self, scheme_id, default=None):
+        index = self._find(scheme_id)
+        return SchemeRecord(self, index) if index is not None else default
+
+    def __getitem__(self, scheme_id):
+        record = self.get(scheme_id)
+        if record is None:
+            raise KeyError(scheme_id)
+        return record
+
+    def __contains__(self, scheme_id):
+        return self._find(scheme_id) is not None
+
+    def _catalogue_order(self):
+        if self._order is None:
+            self._order = sorted(range(self._n_schemes), key=lambda index: SchemeRecord(self, index).position)
+        return self._order
+
+    def __iter__(self):
+        return (str(self._id_bytes(index), 'utf-8') for index in self._catalogue_order())
+
+    def __len__(self):
+        return self._n_schemes
+
+    def records(self):
+        """Every scheme, in catalogue order."""
+        return [SchemeRecord(self, index) for index in self._catalogue_order()]
+
+    def close(self):
+        tag_ids = getattr(self, '_tag_ids', None)
+        if tag_ids is not None:
+            tag_ids.release()
+        self._buffer.release()
+        self._mmap.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert schemes.json into the memory-mapped scheme store.")
+    parser.add_argument('source', nargs='?', default='schemes.json')
+    parser.add_argument('output', nargs='?', default='schemes.bin')
+    args = parser.parse_args()
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        all_schemes = json.load(f)
+    build_store(all_schemes, args.output, file_digest(args.source))
+    print(f"Wrote {len(all_schemes)} schemes to {args.output}")
+
+if __name__ == "__main__":
+    main()
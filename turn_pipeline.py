@@ -0,0 +1,81 @@
+# turn_pipeline.py
+"""
+One chat turn as a small pipeline: the reply text is produced first and returned immediately,
+while speech synthesis and scheme recalculation run concurrently on a shared thread pool.
+The caller waits for them with per-stage timeouts; anything slower is attached later or dropped.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import chatbot
+
+TTS_TIMEOUT = 6.0      # seconds; a reply is still useful without its audio
+SCHEMES_TIMEOUT = 4.0  # seconds; late results are attached on a later rerun
+
+# Shared by every session; the stages are I/O bound (gTTS) or short, so threads are enough
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bot-turn")
+
+class BotTurn:
+    """The reply of one turn plus its background stages, with the latency of each stage in seconds."""
+
+    def __init__(self, response):
+        self.response = response
+        self.latencies = {}
+        self._futures = {}
+        self._submitted = {}
+
+    def submit(self, stage, fn, *args, **kwargs):
+        ctx = get_script_run_ctx()
+
+        def run():
+            # Lets Streamlit caches used by the stage see the session that started it
+            add_script_run_ctx(threading.current_thread(), ctx)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.latencies[stage] = time.perf_counter() - started
+
+        self._submitted[stage] = time.perf_counter()
+        self._futures[stage] = _executor.submit(run)
+
+    def has(self, stage):
+        return stage in self._futures
+
+    def done(self, stage):
+        return stage in self._futures and self._futures[stage].done()
+
+    def result(self, stage, timeout):
+        """
+        Waits up to timeout seconds after the stage was submitted. Returns None if the stage was not
+        started, failed or is still running (it keeps running and can be collected later).
+        """
+        future = self._futures.get(stage)
+        if future is None:
+            return None
+        remaining = max(0.0, self._submitted[stage] + timeout - time.perf_counter())
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            self.latencies.setdefault(f"{stage}_timeout", timeout)
+            return None
+        except Exception:
+            return None
+
+def start_turn(user_message, user_profile, lang, synthesize, find_schemes):
+    """
+    Answers the message right away and starts the slow stages in the background:
+    synthesize(text, lang) always, find_schemes(profile) when the reply asks for new schemes.
+    """
+    started = time.perf_counter()
+    response = chatbot.get_bot_response(user_message, user_profile, lang)
+    turn = BotTurn(response)
+    turn.latencies['reply'] = time.perf_counter() - started
+
+    turn.submit('tts', synthesize, response['text'], lang)
+    if response.get("action") == "calculate_schemes":
+        # A copy, so the sidebar can keep editing the profile while the search runs
+        turn.submit('schemes', find_schemes, dict(user_profile))
+    return turn
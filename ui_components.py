@@ -1,11 +1,15 @@
 # ui_components.py
 import streamlit as st
-from gtts import gTTS
 from streamlit_mic_recorder import speech_to_text
 import io
 from localization import LANGUAGES
+from audio_cache import AudioCache
+import instrumentation
+
+CHAT_PAGE_SIZE = 20  # Chat messages rendered per rerun; "load earlier" adds another page
 
 # This function is unchanged and preserves your UI
+@instrumentation.timed("apply_custom_css")
 def apply_custom_css(theme):
     css = """
         @import url('https://fonts.googleapis.com/css2?family=Manrope:wght@400;700;800&display=swap');
@@ -40,24 +44,31 @@ def apply_custom_css(theme):
     st.markdown(f"<style>{css}{theme_css}</style>", unsafe_allow_html=True)
 
 # --- All other functions are unchanged ---
+@st.cache_resource
+def get_audio_cache():
+    """One audio cache per server process, shared by every session."""
+    return AudioCache()
+
+@instrumentation.timed("text_to_audio")
 def text_to_audio(text, lang='en'):
     try:
-        tts_lang = 'en-IN' if lang == 'en' else lang
-        audio_bytes = io.BytesIO()
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
-        tts.write_to_fp(audio_bytes)
-        audio_bytes.seek(0)
-        return audio_bytes
+        return io.BytesIO(get_audio_cache().get(text, lang))
     except Exception as e: return None
 
+def cached_audio(text, lang='en'):
+    """The audio text_to_audio already rendered for (text, lang), or None; safe on the render path."""
+    audio_bytes = get_audio_cache().peek(text, lang)
+    return io.BytesIO(audio_bytes) if audio_bytes is not None else None
+
 def voice_input_ui(lang, text):
     st.markdown(f"<h3 style='text-align: center;'>{text.get('voice_prompt_header', 'Or Ask With Your Voice')}</h3>", unsafe_allow_html=True)
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        stt_lang = 'en-IN' if lang == 'en' else 'hi-IN'
+        stt_lang = f'{lang}-IN'
         speech_text = speech_to_text(language=stt_lang, key=f'speech_input_{lang}')
     return speech_text
 
+@instrumentation.timed("display_profile_sidebar")
 def display_profile_sidebar(lang):
     text = LANGUAGES[lang]
     with st.sidebar:
@@ -82,9 +93,8 @@ def display_profile_sidebar(lang):
     return False
 
 # --- All other functions are unchanged ---
-def display_scheme_card(scheme, lang):
+def display_scheme_card(scheme, data, lang):
     text = LANGUAGES[lang]
-    data = scheme['data']
     with st.container(border=True):
         st.subheader(data['name'][lang])
         st.markdown(f"**{text['benefit']}:** {data['benefit']} | **{text['match_score']}:** `{scheme['score']}%`")
@@ -95,8 +105,37 @@ def display_scheme_card(scheme, lang):
         with col1: st.link_button(text['apply_now'], data['application_link'], use_container_width=True)
         with col2: st.link_button(text['call_helpline'], data['contact_link'], use_container_width=True)
 
-def display_chat_history():
-    for chat in st.session_state.chat_history:
+def display_pager(page, page_count, text):
+    """Draws previous/next controls for the dashboard and returns the page to show next."""
+    if page_count <= 1:
+        return page
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button(text['previous_page'], disabled=page == 0, use_container_width=True): page -= 1
+    with col2: st.markdown(f"<p style='text-align: center;'>{text['page_status'].format(page=page + 1, pages=page_count)}</p>", unsafe_allow_html=True)
+    with col3:
+        if st.button(text['next_page'], disabled=page >= page_count - 1, use_container_width=True): page += 1
+    return page
+
+@instrumentation.timed("display_chat_history")
+def display_chat_history(text):
+    """Renders only the newest chat_window messages, with a button to page further back."""
+    history = st.session_state.chat_history
+    if len(history) > st.session_state.chat_window:
+        if st.button(text['load_earlier'], use_container_width=True):
+            st.session_state.chat_window += CHAT_PAGE_SIZE
+    for chat in history.window(st.session_state.chat_window):
         avatar = "👤" if chat['type'] == 'user' else "assistant"
         with st.chat_message(name=chat['type'], avatar=avatar):
             st.write(chat['message'])
+
+def display_profiler_panel():
+    """Debug panel with the stage timings of the last reruns (only shown when APP_PROFILE is set)."""
+    with st.sidebar.expander("⏱️ Rerun profiler"):
+        reruns = instrumentation.recent_reruns()
+        if not reruns:
+            st.caption("No completed reruns yet.")
+            return
+        rows = [{'total_ms': round(r['total'] * 1000, 2), **{stage: round(seconds * 1000, 2) for stage, seconds in r['stages'].items()}} for r in reruns]
+        st.dataframe(rows, use_container_width=True)
+        st.download_button("Prometheus metrics", instrumentation.prometheus_text(), file_name="metrics.txt", use_container_width=True)